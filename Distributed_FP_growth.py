@@ -0,0 +1,321 @@
+'''
+Parallel FP-growth (PFP) over several worker nodes.
+The frequent items are split into groups. For every ordered transaction the coordinator sends to each group the
+transaction cut after the last item of that group, so the shard of a group has the whole conditional pattern base
+of every item in it. A worker builds an FP_tree from its shard and mines the conditional FP Trees of the items of
+its group only. Every pattern is mined by exactly one group (the group of its least frequent item) and the counts
+of the groups add up to the count of FP_growth.
+Coordinator and workers talk over TCP. Every message is a JSON header followed by a payload:
+    length of the header (uint32), length of the payload (uint64), header in utf-8, payload
+A job sends the item names, the items of the group and min support with the shard as payload (records of
+FP_growth.partition_writer). The result has the count and no of nodes of the group with the patterns written by a
+sink of the kind asked for as payload.
+Usage:
+    python Distributed_FP_growth.py worker port               # on every node
+    python Distributed_FP_growth.py data_set minSup host:port,host:port,...
+    python Distributed_FP_growth.py data_set minSup 4         # 4 local worker processes
+'''
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import struct
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from FP_growth import FP_tree, FP_growth, PARTITION_RECORD, del_infrequent, find_support_streaming
+from FP_growth import remove_less_support_items, sort_items_on_Value, ordered_transactions, compress_transactions
+from FP_growth import read_partition, single_path_tree, open_sink, text_sink, binary_sink
+
+MESSAGE_HEAD = struct.Struct('<IQ')     # Length of the JSON header, length of the payload.
+
+
+def receive_exactly(sock,size):
+    data = bytearray()
+    while(len(data) < size):
+        chunk = sock.recv(min(size - len(data),1<<20))
+        if not chunk:
+            raise ConnectionError("Connection closed in the middle of a message")
+        data += chunk
+    return bytes(data)
+
+
+def send_message(sock,header,path=None):
+    '''
+    Sends header (a Dictionary) with the contents of the file at path as payload, no payload if path is None.
+    '''
+    data = json.dumps(header).encode('utf-8')
+    size = os.path.getsize(path) if path is not None else 0
+    sock.sendall(MESSAGE_HEAD.pack(len(data),size) + data)
+    if size:
+        with open(path,'rb') as file:
+            sock.sendfile(file)
+
+
+def receive_message(sock,path=None):
+    '''
+    Receives a message of send_message. The payload is written to the file at path (made even when the payload is
+    empty), in pieces so it is never held in memory.
+    Output: The header, None if the connection was closed before the message.
+    '''
+    head = sock.recv(MESSAGE_HEAD.size)
+    if not head:
+        return None
+    if(len(head) < MESSAGE_HEAD.size):
+        head += receive_exactly(sock,MESSAGE_HEAD.size - len(head))
+    header_size,size = MESSAGE_HEAD.unpack(head)
+    header = json.loads(receive_exactly(sock,header_size).decode('utf-8'))
+    if path is not None:
+        with open(path,'wb') as file:
+            while(size > 0):
+                chunk = sock.recv(min(size,1<<20))
+                if not chunk:
+                    raise ConnectionError("Connection closed in the middle of a message")
+                file.write(chunk)
+                size -= len(chunk)
+    elif size:
+        raise ValueError("Unexpected payload of " + str(size) + " bytes")
+    return header
+
+
+def group_items(supports,no_of_groups):
+    '''
+    Splits the item ranks into no_of_groups groups of about the same work. The conditional pattern base of the
+    item of rank r has at most support x r items, every item goes to the group with the least of that so far,
+    biggest items first.
+    Output: A list of groups, every group a list of item ranks in rank order.
+    '''
+    groups = [[] for i in range(no_of_groups)]
+    loads = [0]*no_of_groups
+    for rank in sorted(range(len(supports)),key=lambda rank: supports[rank]*(rank + 1),reverse=True):
+        group = loads.index(min(loads))
+        groups[group].append(rank)
+        loads[group] += supports[rank]*(rank + 1)
+    for group in groups:
+        group.sort()
+    return groups
+
+
+def mine_shard(shard_path,names,items,minsup,output_file=None):
+    '''
+    Work of a worker for one group. Builds an FP_tree from the shard and mines the conditional FP Tree of every
+    item of the group like FP_growth does at the top of the tree.
+    Output: (count, no_of_nodes) of the group.
+    '''
+    fp_tree = FP_tree()
+    for ranks,weight,first in read_partition(shard_path):
+        fp_tree.insert([names[rank] for rank in ranks],weight)
+    keys = [names[rank] for rank in items if names[rank] in fp_tree.header_table]
+    conditional_pattern_base = del_infrequent(fp_tree.find_coditional_pattern_base(keys),minsup)
+    count = 0
+    no_of_nodes = 0
+    for key,values in conditional_pattern_base.items():
+        new_fp_tree = fp_tree.conditional_tree()
+        for qtuple in values:
+            new_fp_tree.insert(qtuple[0],qtuple[1])
+        a,b = FP_growth(new_fp_tree,[key],fp_tree.header_table[key][0],output_file,minsup)
+        count += a
+        no_of_nodes += b
+    return count,no_of_nodes
+
+
+def serve(host='127.0.0.1',port=0,ready=None):
+    '''
+    Worker node. Accepts coordinator connections on (host, port) and runs the jobs sent over them one at a time,
+    until a stop message. ready - A queue which gets the port once the worker listens (port 0 picks a free one).
+    '''
+    server = socket.create_server((host,port))
+    if ready is not None:
+        ready.put(server.getsockname()[1])
+    work_dir = tempfile.mkdtemp(prefix='pfp_worker_')
+    shard_path = os.path.join(work_dir,'shard')
+    part_path = os.path.join(work_dir,'patterns')
+    try:
+        while True:
+            conn,address = server.accept()
+            with conn:
+                while True:
+                    header = receive_message(conn,shard_path)
+                    if header is None:
+                        break
+                    if(header['type'] == 'stop'):
+                        return
+                    try:
+                        output_file = open_sink(header['output_format'],part_path)
+                        count,no_of_nodes = mine_shard(shard_path,header['names'],header['items'],header['minsup'],
+                                                       output_file)
+                        output_file.close()
+                    except Exception as error:
+                        send_message(conn,{'type':'error','message':repr(error)})
+                        continue
+                    payload = part_path if header['output_format'] != 'count' else None
+                    send_message(conn,{'type':'result','count':count,'nodes':no_of_nodes},payload)
+    finally:
+        server.close()
+        shutil.rmtree(work_dir)
+
+
+def write_shards(pathToDataSet,sorted_frequent_items,groups,shard_dir):
+    '''
+    Second pass of the coordinator. Every ordered transaction is written to the shard of each group it has an
+    item of, cut after its last item of that group. Equal transactions are written once with their count in the
+    order they first appear, so a worker builds the tree nodes of its items in the same order as FP_growth.
+    Output: (list of shard paths, Dictionary of record -> weight if the FP Tree of the data set is a single path
+             else None).
+    '''
+    item_rank = {}
+    for key in sorted_frequent_items.keys():
+        item_rank[key] = len(item_rank)
+    group_of = {}
+    for group,items in enumerate(groups):
+        for rank in items:
+            group_of[rank] = group
+    paths = [os.path.join(shard_dir,'shard' + str(group)) for group in range(len(groups))]
+    files = [open(path,'wb',buffering=1<<20) for path in paths]
+    path = {}
+    longest = ()
+    itemsets = compress_transactions(ordered_transactions(pathToDataSet,sorted_frequent_items))
+    for first,(itemset,weight) in enumerate(itemsets):
+        ranks = tuple([item_rank[item] for item in itemset])
+        if not ranks:
+            continue
+        if path is not None:     # Same single path check as FP_growth.write_partitions.
+            if(len(ranks) > len(longest)):
+                shorter,longest = longest,ranks
+            else:
+                shorter = ranks
+            if(shorter == longest[:len(shorter)]):
+                path[ranks] = path.get(ranks,0) + weight
+            else:
+                path = None
+        sent = set()
+        for j in range(len(ranks) - 1,-1,-1):
+            group = group_of[ranks[j]]
+            if group not in sent:
+                sent.add(group)
+                record = ranks[:j + 1]
+                files[group].write(PARTITION_RECORD.pack(len(record),weight,first) +
+                                   struct.pack('<%dI' % len(record),*record))
+    for file in files:
+        file.close()
+    return paths,path
+
+
+def run_jobs(address,jobs,names,groups,minsup,output_format,shard_paths,work_dir):
+    '''
+    Sends the groups in jobs to the worker at address one after the other over one connection.
+    Output: List of (count, no_of_nodes, path of the patterns) per job.
+    '''
+    results = []
+    with socket.create_connection(address) as sock:
+        for group in jobs:
+            header = {'type':'job','names':names,'items':groups[group],'minsup':minsup,'output_format':output_format}
+            send_message(sock,header,shard_paths[group])
+            part_path = os.path.join(work_dir,'patterns' + str(group))
+            header = receive_message(sock,part_path)
+            if header is None:
+                raise ConnectionError("Worker " + str(address) + " closed the connection")
+            if(header['type'] == 'error'):
+                raise RuntimeError("Worker " + str(address) + " failed: " + header['message'])
+            results.append((header['count'],header['nodes'],part_path))
+    return results
+
+
+def distributed_FP_growth(pathToDataSet,minSup,workers,output_file=None,no_of_groups=None,work_dir=None):
+    '''
+    Coordinator of PFP. Gives the same (count, no_of_nodes) as FP_growth on the FP Tree of main.
+    minSup - min support value in percentage.
+    workers - List of (host, port) of worker nodes (see serve).
+    output_file - A pattern sink of FP_growth (count_sink, text_sink or binary_sink), or None. The patterns of
+                  every group are merged into it.
+    no_of_groups - No of groups, defaults to the no of workers. The groups are spread over the workers.
+    work_dir - Directory for the shards, defaults to the temporary directory.
+    Output: (count, no_of_nodes, no of transactions).
+    '''
+    items_support,total_trans = find_support_streaming(pathToDataSet)
+    minsup = (minSup*total_trans/100)
+    sorted_frequent_items = sort_items_on_Value(remove_less_support_items(items_support,minsup))
+    names = list(sorted_frequent_items)
+    groups = group_items(list(sorted_frequent_items.values()),no_of_groups or len(workers))
+    shard_dir = tempfile.mkdtemp(prefix='pfp_',dir=work_dir)
+    try:
+        shard_paths,single_path = write_shards(pathToDataSet,sorted_frequent_items,groups,shard_dir)
+        if single_path is not None:     # FP_growth counts a single path at once, there is nothing to split.
+            count,no_of_nodes = FP_growth(single_path_tree(single_path,names),[],0,output_file,minsup)
+            return count,no_of_nodes,total_trans
+        output_format = {text_sink:'text',binary_sink:'binary'}.get(type(output_file),'count')
+        jobs = [[] for address in workers]
+        for group in range(len(groups)):
+            jobs[group % len(workers)].append(group)
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            futures = [executor.submit(run_jobs,address,job,names,groups,minsup,output_format,shard_paths,shard_dir)
+                       for address,job in zip(workers,jobs) if job]
+            results = [result for future in futures for result in future.result()]
+        count = 0
+        no_of_nodes = 0
+        for a,b,part_path in results:
+            count += a
+            no_of_nodes += b
+            if output_file is not None:
+                output_file.merge(part_path,a)
+    finally:
+        shutil.rmtree(shard_dir)
+    return count,no_of_nodes,total_trans
+
+
+def start_local_workers(no_of_workers):
+    '''
+    Starts no_of_workers worker processes on this machine standing in for nodes.
+    Output: (list of processes, list of (host, port)).
+    '''
+    ready = multiprocessing.Queue()
+    processes = []
+    for i in range(no_of_workers):
+        process = multiprocessing.Process(target=serve,args=('127.0.0.1',0,ready),daemon=True)
+        process.start()
+        processes.append(process)
+    return processes,[('127.0.0.1',ready.get()) for process in processes]
+
+
+def stop_workers(workers):
+    for address in workers:
+        with socket.create_connection(address) as sock:
+            send_message(sock,{'type':'stop'})
+
+
+def main(pathToDataSet,minSup,workers=2,output_format='count',output_path='output.txt',no_of_groups=None):
+    '''
+    Inputs: pathToDataSet - Path to the data set.
+            minSup - min support value in percentage.
+            workers - List of (host, port) of running workers, or a no of local worker processes to start.
+            output_format - 'count', 'text' or 'binary' (see FP_growth.open_sink).
+            no_of_groups - No of item groups, defaults to the no of workers.
+    '''
+    processes = []
+    if isinstance(workers,int):
+        processes,workers = start_local_workers(workers)
+    file = open_sink(output_format,output_path)
+    try:
+        total_patterns,nodeCount,total_trans = distributed_FP_growth(pathToDataSet,minSup,workers,file,no_of_groups)
+    finally:
+        file.close()
+        if processes:
+            stop_workers(workers)
+            for process in processes:
+                process.join()
+    print("No of Transactions:",total_trans)
+    print("No of Frequent Patterns:",total_patterns)
+    print("No of Nodes:",nodeCount)
+
+
+
+if(__name__ == "__main__"):
+    if(sys.argv[1] == 'worker'):
+        serve('0.0.0.0',int(sys.argv[2]))
+    elif ':' in sys.argv[3]:
+        addresses = [(address.rsplit(':',1)[0],int(address.rsplit(':',1)[1])) for address in sys.argv[3].split(',')]
+        main(sys.argv[1],float(sys.argv[2]),addresses)      # support in percentage
+    else:
+        main(sys.argv[1],float(sys.argv[2]),int(sys.argv[3]))
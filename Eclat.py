@@ -0,0 +1,120 @@
+'''
+Vertical mining backend (Eclat / dEclat) for dense data sets where FP Trees share almost no prefixes.
+Every frequent item is stored as a bitset of the transactions containing it (a Python int, bit i is transaction i)
+and itemsets are found depth first by intersecting the bitsets (Eclat) or by subtracting diffsets (dEclat).
+Preprocessing and minSup are the same as FP_growth.main and the same patterns are found. Only non empty patterns
+are counted, FP_growth.main also counts the empty pattern when the FP Tree is a single path or empty, so its count is
+1 higher on such data sets.
+'''
+import sys
+
+from FP_growth import find_support_streaming, read_transactions, remove_less_support_items, sort_items_on_Value, open_sink
+
+
+def build_bitsets(pathToDataSet,sorted_frequent_items):
+    '''
+    Reads the data set and makes the bitset of every frequent item.
+    Input:  pathToDataSet - Path to the data set.
+            sorted_frequent_items - Sorted Frequent itemset with item names key and support count as values.
+    Output: A Dictionary with item as key and bitset as value.
+    '''
+    tids = {}
+    for key in sorted_frequent_items.keys():
+        tids[key] = []
+    tid = 0
+    for transaction in read_transactions(pathToDataSet):
+        for item in set(transaction):
+            if item in tids:
+                tids[item].append(tid)
+        tid += 1
+    bitsets = {}
+    for key,values in tids.items():
+        bits = bytearray((tid + 7)//8)       # Setting the bits in a bytearray avoids rebuilding a big int per bit.
+        for t in values:
+            bits[t >> 3] |= 1 << (t & 7)
+        bitsets[key] = int.from_bytes(bits,'little')
+    return bitsets
+
+
+def eclat(prefix,items,minsup,output_file):
+    '''
+    Eclat. items is a list of (item, bitset, support) which all extend prefix. Every item gives the pattern
+    prefix + item and its extensions are found by intersecting its bitset with the bitsets of the items after it.
+    Output: No of patterns.
+    '''
+    count = 0
+    for i in range(len(items)):
+        item,bits,support = items[i]
+        pattern = prefix + (item,)
+        count += 1
+        if output_file is not None:
+            output_file.emit(pattern,support)
+        new_items = []
+        for other,other_bits,other_support in items[i + 1:]:
+            new_bits = bits & other_bits
+            new_support = new_bits.bit_count()
+            if(new_support >= minsup):
+                new_items.append((other,new_bits,new_support))
+        if new_items:
+            count += eclat(pattern,new_items,minsup,output_file)
+    return count
+
+
+def declat(prefix,items,minsup,output_file,diffsets=False):
+    '''
+    dEclat. Same as eclat but below the first level every item keeps its diffset i,e., the transactions of the
+    prefix which do not contain it, and support(PXY) = support(PX) - |d(PXY)| where d(PXY) = d(PY) - d(PX).
+    Diffsets shrink quickly on dense data. items are bitsets on the first level (diffsets False).
+    Output: No of patterns.
+    '''
+    count = 0
+    for i in range(len(items)):
+        item,bits,support = items[i]
+        pattern = prefix + (item,)
+        count += 1
+        if output_file is not None:
+            output_file.emit(pattern,support)
+        new_items = []
+        for other,other_bits,other_support in items[i + 1:]:
+            if diffsets:
+                new_bits = other_bits & ~bits
+            else:
+                new_bits = bits & ~other_bits
+            new_support = support - new_bits.bit_count()
+            if(new_support >= minsup):
+                new_items.append((other,new_bits,new_support))
+        if new_items:
+            count += declat(pattern,new_items,minsup,output_file,True)
+    return count
+
+
+def main(pathToDataSet,minSup,diffsets=True,output_format='count',output_path='output.txt'):
+    '''
+    Inputs: pathToDataSet - Absolute path to the data set.
+            minSup - min support value in percentage.
+            diffsets - Use dEclat (diffsets), else Eclat (bitset intersections).
+            output_format - 'count', 'text' or 'binary', see FP_growth.open_sink.
+    Output: No of non empty frequent patterns (see above for the difference with FP_growth.main).
+    '''
+    items_support,total_trans = find_support_streaming(pathToDataSet)
+    minSup = (minSup*total_trans/100)      # Percentage => to normal.
+    print("No of Transactions:",total_trans)
+    print("No of Items:",len(items_support))
+    frequent_items = remove_less_support_items(items_support,minSup)
+    sorted_frequent_items = sort_items_on_Value(frequent_items)
+    print("No of Frequent Items:",len(frequent_items))
+    bitsets = build_bitsets(pathToDataSet,sorted_frequent_items)
+    items = [(key,bitsets[key],bitsets[key].bit_count()) for key in reversed(list(sorted_frequent_items.keys()))]
+    file = open_sink(output_format,output_path)
+    if diffsets:
+        total_patterns = declat((),items,minSup,file)
+    else:
+        total_patterns = eclat((),items,minSup,file)
+    print("No of Frequent Patterns:",total_patterns)
+    file.close()
+    return total_patterns
+
+
+
+if(__name__ == "__main__"):
+    main(sys.argv[1],float(sys.argv[2]))         #support in percentage
@@ -1,6 +1,28 @@
-import csv
+import collections
+import gzip
+import heapq
 import itertools
+import json
+import mmap
+import os
+import shutil
+import struct
 import sys
+import tempfile
+import warnings
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import numpy as np
+except ImportError:      # NumPy is optional, the item matrix functions fall back to plain Python.
+    np = None
+try:
+    import zstandard
+except ImportError:      # zstandard is optional, only needed for .zst data sets (see read_chunks).
+    zstandard = None
+
+profiler = None     # An FP_profiler.fp_profiler while profiling (see FP_profiler.profiling), hooks are skipped when None.
 
 def find_support_for_every_item(data):
     '''
@@ -20,6 +42,164 @@ def find_support_for_every_item(data):
     return items_support
 
 
+DATA_FORMATS = ('text','fimi','spmf')     # Formats of the data sets, see read_transactions.
+
+
+class item_index(dict):
+    '''
+    Item bytes -> integer id, ids are given in the order the items first appear.
+    '''
+    def __missing__(self,key):
+        item_id = self[key] = len(self)
+        return item_id
+
+
+def read_chunks(pathToDataSet,chunk_size=1<<24):
+    '''
+    Reads the data set in pieces of about chunk_size bytes, every piece ends at the end of a line.
+    Plain files are memory mapped. Files ending in .gz are read with gzip and files ending in .zst with the
+    zstandard package (optional, only needed for them), both without decompressing the whole file.
+    Output: Yields bytes.
+    '''
+    if pathToDataSet.endswith('.gz'):
+        stream = gzip.open(pathToDataSet,'rb')
+    elif pathToDataSet.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError("Reading .zst data sets needs the zstandard package")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(pathToDataSet,'rb'),closefd=True)
+    else:
+        with open(pathToDataSet,'rb') as file:
+            if(os.fstat(file.fileno()).st_size == 0):
+                return
+            with mmap.mmap(file.fileno(),0,access=mmap.ACCESS_READ) as data:
+                start = 0
+                while(start < len(data)):
+                    end = data.find(b'\n',start + chunk_size)
+                    end = len(data) if end == -1 else end + 1
+                    yield data[start:end]
+                    start = end
+        return
+    with stream:
+        rest = b''
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            chunk = rest + chunk
+            end = chunk.rfind(b'\n') + 1
+            rest = chunk[end:]
+            if end:
+                yield chunk[:end]
+        if rest:
+            yield rest
+
+
+def read_lines(pathToDataSet,data_format='text'):
+    '''
+    Yields the lines of every piece of read_chunks as bytes, one list per piece. Lines of SPMF comments and
+    metadata (starting with #, % or @) are left out in spmf format.
+    '''
+    if(data_format not in DATA_FORMATS):
+        raise ValueError("Unknown data format: " + str(data_format))
+    for chunk in read_chunks(pathToDataSet):
+        lines = chunk.split(b'\n')
+        if not lines[-1]:
+            lines.pop()     # Nothing after the last end of line.
+        if(data_format == 'spmf'):
+            lines = [line for line in lines if not line.startswith((b'#',b'%',b'@'))]
+        yield lines
+
+
+def integer_transactions(lines):
+    '''
+    Integer items of every line of lines (bytes) as lists, parsed for all the lines at once with NumPy. The
+    transaction of a line ends after the no of items which start before its end of line. Lines NumPy can not read
+    to their end (not integers) are parsed with int instead, which raises ValueError for them.
+    '''
+    text = b'\n'.join(lines) + b'\n'
+    data = np.frombuffer(text,dtype=np.uint8)
+    space = (data == 32) | ((data >= 9) & (data <= 13))     # White space of bytes.split, ' ' and \t to \r.
+    starts = ~space
+    starts[1:] &= space[:-1]
+    ends = np.cumsum(starts)[data == 10].tolist()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore',DeprecationWarning)      # Older NumPy warns and stops at the bad item.
+            values = np.fromstring(text,dtype=np.int64,sep=' ')
+    except ValueError:      # Newer NumPy raises.
+        values = ()
+    if(len(values) != ends[-1]):
+        for line in lines:
+            yield list(map(int,line.split()))
+        return
+    values = values.tolist()
+    start = 0
+    for end in ends:
+        yield values[start:end]
+        start = end
+
+
+def read_transactions(pathToDataSet,data_format='text',item_ids=None):
+    '''
+    Generator over the transactions of the data set. The file is split as bytes (see read_chunks), only one
+    piece of it is kept in memory at a time.
+    input: pathToDataSet - Path to the data set, one transaction per line, plain, .gz or .zst.
+           data_format - 'text' items are names separated by white space, 'fimi' items are integers separated
+                         by white space, 'spmf' same as fimi with comment and metadata lines.
+           item_ids - A Dictionary. If given the items are encoded to integer ids instead of names, fimi and spmf
+                      items are their own integer and names get ids in the order they first appear. item_ids
+                      gets name -> id for them once every transaction is read.
+    Output: Yields every transaction as a list of items, empty items are removed. An empty line is an empty
+            transaction like with csv.reader.
+    Names are a little faster than the lists of csv.reader. Ids cost a lookup (text) or a parse (fimi, spmf) per
+    item, fimi and spmf items are parsed a chunk at a time with NumPy when it is installed (integer_transactions).
+    They are slower than the strings of csv.reader. Only the support counting pass (find_support_streaming) is
+    several times faster than with csv.reader.
+    '''
+    if item_ids is None:
+        for lines in read_lines(pathToDataSet,data_format):
+            for line in lines:
+                yield line.decode('utf-8').split()
+    elif(data_format == 'text'):
+        index = item_index()
+        for lines in read_lines(pathToDataSet,data_format):
+            for line in lines:
+                yield list(map(index.__getitem__,line.split()))
+        for key,item_id in index.items():
+            item_ids[key.decode('utf-8')] = item_id
+    elif np is None:
+        for lines in read_lines(pathToDataSet,data_format):
+            for line in lines:
+                yield list(map(int,line.split()))
+    else:
+        for lines in read_lines(pathToDataSet,data_format):
+            yield from integer_transactions(lines)
+
+
+def find_support_streaming(pathToDataSet,data_format='text'):
+    '''
+    First pass of the streaming mode. Same as find_support_for_every_item but the data set is read from the
+    file. The items of a whole piece of the file are counted at once without making the transactions.
+    Output: A Dictionary with item as key and support count as value and the no of transactions.
+    '''
+    counts = collections.Counter()
+    total_trans = 0
+    if(data_format == 'spmf'):
+        for lines in read_lines(pathToDataSet,data_format):
+            total_trans += len(lines)
+            counts.update(b' '.join(lines).split())
+    elif(data_format in DATA_FORMATS):
+        for chunk in read_chunks(pathToDataSet):
+            total_trans += chunk.count(b'\n') + (not chunk.endswith(b'\n'))
+            counts.update(chunk.split())
+    else:
+        raise ValueError("Unknown data format: " + str(data_format))
+    items_support = {}
+    for key,value in counts.items():
+        items_support[sys.intern(key.decode('utf-8'))] = value
+    return items_support,total_trans
+
+
 # In[71]:
 
 
@@ -73,6 +253,132 @@ def order_items(data,sorted_frequent_items):
     return ordered_dataset
 
 
+def ordered_transactions(pathToDataSet,sorted_frequent_items,data_format='text'):
+    '''
+    Second pass of the streaming mode. Re-reads the data set and yields every transaction ordered like order_items
+    does, without keeping the data set in memory and without changing it.
+    input:  a) pathToDataSet - Path to the data set.
+            b) sorted_frequent_items - Sorted Frequent itemset with item names key and support count as values.
+            c) data_format - See read_transactions.
+    '''
+    item_rank = {}
+    for key in sorted_frequent_items.keys():
+        item_rank[key] = len(item_rank)
+    for transaction in read_transactions(pathToDataSet,data_format):
+        yield sorted(set(item for item in transaction if item in item_rank),key=item_rank.get)
+
+
+def compress_transactions(ordered_dataset,batch_size=100000):
+    '''
+    Hashes the ordered transactions into (itemset, no of such transactions) so every distinct basket is inserted
+    into the FP Tree once. Itemsets are given in the order they first appear, which makes the same tree as
+    inserting every transaction. Only batch_size distinct itemsets are kept at a time (streaming mode).
+    Output: Yields (itemset, weight).
+    '''
+    batch = {}
+    for itemset in ordered_dataset:
+        itemset = tuple(itemset)
+        batch[itemset] = batch.get(itemset,0) + 1
+        if(len(batch) >= batch_size):
+            yield from batch.items()
+            batch = {}
+    yield from batch.items()
+
+
+def encode_dataset(data):
+    '''
+    Encodes the data set once into a CSR style sparse item matrix. Items get integer ids in the order they first
+    appear, empty items are dropped and duplicates inside a transaction are kept (find_support_for_every_item
+    counts them too).
+    input: A List of transactions.
+    Output: (indptr, indices, item_names) - Items of transaction i are indices[indptr[i]:indptr[i+1]] and
+            item_names[id] is the name of item id.
+    '''
+    item_ids = {}
+    item_names = []
+    indptr = array('q',[0])
+    indices = array('q')
+    for transaction in data:
+        for item in transaction:
+            if(item == ''):      # Data Cleaning eliminate empty space.
+                continue
+            item_id = item_ids.get(item)
+            if item_id is None:
+                item_id = len(item_names)
+                item_ids[item] = item_id
+                item_names.append(item)
+            indices.append(item_id)
+        indptr.append(len(indices))
+    return indptr,indices,item_names
+
+
+def encode_file(pathToDataSet,data_format='text'):
+    '''
+    Same item matrix as encode_dataset(read_transactions(pathToDataSet,data_format)) without making the
+    transactions, the items of every line of read_lines go straight from bytes to their ids.
+    Output: (indptr, indices, item_names) of encode_dataset.
+    '''
+    index = item_index()
+    indptr = array('q',[0])
+    indices = array('q')
+    for lines in read_lines(pathToDataSet,data_format):
+        for line in lines:
+            indices.extend(map(index.__getitem__,line.split()))
+            indptr.append(len(indices))
+    item_names = [sys.intern(key.decode('utf-8')) for key in index]
+    return indptr,indices,item_names
+
+
+def support_from_matrix(indices,item_names):
+    '''
+    Support count of every item from the item matrix of encode_dataset with a single bincount.
+    Output: Same dictionary as find_support_for_every_item, in the same order.
+    '''
+    if np is not None:
+        counts = np.bincount(np.frombuffer(indices,dtype=np.int64),minlength=len(item_names)).tolist()
+    else:
+        counts = [0]*len(item_names)
+        for item_id in indices:
+            counts[item_id] += 1
+    return dict(zip(item_names,counts))
+
+
+def order_items_from_matrix(indptr,indices,item_names,sorted_frequent_items):
+    '''
+    Same ordered transactions as order_items but from the item matrix of encode_dataset. Every item id is mapped
+    to its rank in sorted_frequent_items (-1 for infrequent items), then all transactions are sorted at once by
+    (transaction, rank) and duplicates are dropped.
+    Output: A list of ordered transactions (lists of item names).
+    '''
+    item_rank = {}
+    for key in sorted_frequent_items.keys():
+        item_rank[key] = len(item_rank)
+    names = list(sorted_frequent_items.keys())
+    no_of_trans = len(indptr) - 1
+    if np is None:
+        rank = [item_rank.get(item,-1) for item in item_names]
+        ordered_dataset = []
+        for i in range(no_of_trans):
+            ranks = sorted(set(rank[item_id] for item_id in indices[indptr[i]:indptr[i + 1]]) - {-1})
+            ordered_dataset.append([names[r] for r in ranks])
+        return ordered_dataset
+    rank = np.array([item_rank.get(item,-1) for item in item_names],dtype=np.int64)
+    rows = np.repeat(np.arange(no_of_trans,dtype=np.int64),np.diff(np.frombuffer(indptr,dtype=np.int64)))
+    ranks = rank[np.frombuffer(indices,dtype=np.int64)]
+    keep = ranks >= 0
+    rows = rows[keep]
+    ranks = ranks[keep]
+    order = np.lexsort((ranks,rows))
+    rows = rows[order]
+    ranks = ranks[order]
+    first = np.ones(len(ranks),dtype=bool)      # Drop an item repeated in the same transaction.
+    first[1:] = (rows[1:] != rows[:-1]) | (ranks[1:] != ranks[:-1])
+    rows = rows[first]
+    ranks = ranks[first].tolist()
+    bounds = np.concatenate(([0],np.cumsum(np.bincount(rows,minlength=no_of_trans)))).tolist()
+    return [[names[r] for r in ranks[bounds[i]:bounds[i + 1]]] for i in range(no_of_trans)]
+
+
 # In[74]:
 
 
@@ -104,14 +410,19 @@ class treeNode:
 
 
 class FP_tree:
-    def __init__(self):
+    def __init__(self,indexed=False):
         '''
         header_table is a dictionary where keys are item names and values are a list of support value and nextNode LInk.
         Conventional Header_Table.
+        indexed - Build mode where children are looked up in child_index and new nodes are linked through
+                  header_tail, so inserting an itemset costs time proportional to its length.
         '''
         self.header_table = {}
         self.root =  treeNode('root',0,None)
         self.nodeCount = 1
+        self.indexed = indexed
+        self.child_index = {}   # (parent node, item) -> child node. Only kept in indexed mode.
+        self.header_tail = {}   # item -> last node of its linked list. Only kept in indexed mode.
         
     def insert(self,itemset,counter):
         '''
@@ -120,6 +431,10 @@ class FP_tree:
                 2) Counter - No of such itemsets. i,e., no of times the itemset to be inserted.
         
         '''
+        if profiler is not None:
+            profiler.insert(itemset)
+        if self.indexed:
+            return self.insert_indexed(itemset,counter)
         parent = self.root
         itemset = list(itemset) # Just to make it list given in anyform
         for item in itemset:
@@ -140,6 +455,33 @@ class FP_tree:
         return
     
     
+    def insert_indexed(self,itemset,counter):
+        '''
+        Same as insert but child lookup is a dictionary lookup and the new node is added at the tail of its
+        linked list directly. Builds exactly the same tree as insert.
+        The index is only valid while the tree is being built, pruning (MIS_tree) does not update it.
+        '''
+        parent = self.root
+        for item in itemset:
+            node = self.child_index.get((parent,item))
+            if node is not None:
+                node.inc(counter)
+                self.header_table[item][0] += counter
+            else:
+                node = treeNode(item,counter,parent)
+                self.nodeCount += 1
+                parent.children.append(node)
+                self.child_index[(parent,item)] = node
+                if item not in self.header_table:
+                    self.header_table[item] = [counter,node]
+                else:
+                    self.header_table[item][0] += counter
+                    self.header_tail[item].nextLink = node
+                self.header_tail[item] = node
+            parent = node
+        return
+    
+    
     def findPrefixPath(self,node):
         '''
         Returns all the id's of the nodes in the path from root to this node.
@@ -159,14 +501,23 @@ class FP_tree:
         return all_paths
     
     
-    def find_coditional_pattern_base(self):
+    def find_coditional_pattern_base(self,items=None):
         '''
         Output: Dictionary with item as key and tuple of list of paths returned by findPrefix Path method.
         This coditional_pattern_base is later used for generating frequent patterns.
+        items - Only the conditional pattern bases of these items (in this order), default all of the header table.
         '''
+        if profiler is not None:
+            start = profiler.clock()
         conditional_pattern_base = {}
-        for values in self.header_table.values():
-            conditional_pattern_base[values[1].id] = self.findPrefixPath(values[1])
+        if items is not None:
+            for key in items:
+                conditional_pattern_base[key] = self.findPrefixPath(self.header_table[key][1])
+        else:
+            for values in self.header_table.values():
+                conditional_pattern_base[values[1].id] = self.findPrefixPath(values[1])
+        if profiler is not None:
+            profiler.add_time('find_coditional_pattern_base',start)
         return conditional_pattern_base
     
     
@@ -197,37 +548,647 @@ class FP_tree:
             sum += nextNode.counter
             nextNode = nextNode.nextLink
         return sum
+    def conditional_tree(self):
+        '''
+        Returns a new empty tree of the same kind. FP_growth builds the conditional FP Trees through this method
+        so that it works on top of both FP_tree and FP_array_tree.
+        '''
+        return FP_tree(self.indexed)
+    def child(self,parent,item):
+        '''
+        Returns the child of parent with the given item or None.
+        '''
+        if self.indexed:
+            return self.child_index.get((parent,item))
+        for node in parent.children:
+            if(node.id == item):
+                return node
+        return None
+    def count_ending(self,itemset):
+        '''
+        No of inserted itemsets which are exactly itemset (in the order it was inserted), i,e., the counter of its
+        last node less the counters of that node's children. 0 if itemset is not a path of the tree.
+        '''
+        node = self.root
+        for item in itemset:
+            node = self.child(node,item)
+            if node is None:
+                return 0
+        return node.counter - sum(child.counter for child in node.children)
+    def remove(self,itemset,counter):
+        '''
+        Removes the entire item set from FP Tree, the opposite of insert.
+        Input : 1) itemset - List of items, in the same order as it was inserted.
+                2) Counter - No of such itemsets to be removed.
+        Nodes whose counter becomes 0 are taken out of the tree and of their linked lists. Raises ValueError and
+        changes nothing if fewer than counter such itemsets were inserted (see count_ending).
+        '''
+        if(itemset and self.count_ending(itemset) < counter):
+            raise ValueError("Itemset is not in the FP Tree: " + str(itemset))
+        nodes = []
+        parent = self.root
+        for item in itemset:
+            parent = self.child(parent,item)
+            nodes.append(parent)
+        empty = []
+        for node in nodes:
+            node.counter -= counter
+            self.header_table[node.id][0] -= counter
+            if(node.counter == 0):
+                empty.append(node)
+        self.unlink_nodes(empty)
+    def unlink_nodes(self,nodes):
+        '''
+        Takes the nodes out of the children of their parents and out of their linked lists. The linked list of
+        every item is walked only once. Items left with no nodes are removed from the header table.
+        '''
+        removed = {}
+        for node in nodes:
+            removed.setdefault(node.id,set()).add(id(node))
+            node.parent.children.remove(node)
+            self.child_index.pop((node.parent,node.id),None)
+            self.nodeCount -= 1
+        for item,ids in removed.items():
+            values = self.header_table[item]
+            prev = None
+            node = values[1]
+            while(node):
+                if id(node) in ids:
+                    if prev is None:
+                        values[1] = node.nextLink
+                    else:
+                        prev.nextLink = node.nextLink
+                else:
+                    prev = node
+                node = node.nextLink
+            if(values[1] is None):
+                del self.header_table[item]
+                self.header_tail.pop(item,None)
+            elif self.indexed:
+                self.header_tail[item] = prev
+    def conditional_supports(self,item):
+        '''
+        Support of every item in the conditional pattern base of item, counted while walking its node links.
+        Output: A Dictionary with item as key and support as value, in the order del_infrequent meets the items.
+        '''
+        item_support = {}
+        path = []
+        node = self.header_table[item][1]
+        while(node):
+            pnode = node.parent
+            while(pnode.id != 'root'):
+                path.append(pnode.id)
+                pnode = pnode.parent
+            for pitem in reversed(path):
+                item_support[pitem] = item_support.get(pitem,0) + node.counter
+            path.clear()
+            node = node.nextLink
+        return item_support
+
+    def project(self,item,minsup,order=None,item_support=None):
+        '''
+        Builds the conditional FP Tree of item straight from its node links, without making the conditional pattern
+        base. Supports of the items above every node of item are counted while walking the node links, the items
+        with support at least minsup are ranked like del_infrequent does and the second walk inserts every path
+        ordered by that rank. Gives the same tree as inserting the output of del_infrequent for item.
+        order - A Dictionary of item rank used to order the paths instead of the conditional supports
+                (FP_close and FP_max keep one global order).
+        item_support - Output of conditional_supports if it is already known. Only the items in it are kept.
+        '''
+        if item_support is None:
+            item_support = self.conditional_supports(item)
+        item_rank = {}
+        for key in sorted(item_support,key=item_support.get,reverse=True):
+            if(item_support[key] >= minsup):
+                item_rank[key] = len(item_rank) if order is None else order[key]
+        path = []
+        new_fp_tree = self.conditional_tree()
+        node = self.header_table[item][1]
+        while(node):
+            pnode = node.parent
+            while(pnode.id != 'root'):
+                if pnode.id in item_rank:
+                    path.append(pnode.id)
+                pnode = pnode.parent
+            if path:
+                path.sort(key=item_rank.get)
+                new_fp_tree.insert(path,node.counter)
+                path.clear()
+            node = node.nextLink
+        return new_fp_tree
+
+
+class array_treeNode:
+    '''
+    A light weight view of a single node of FP_array_tree. Nodes of FP_array_tree are just indexes into its arrays,
+    this view gives them the same attributes as treeNode (id, counter, parent, nextLink, children) so that
+    check_for_single_prefix_path, generate_patterns and disp work unchanged. Views are created only on access.
+    '''
+    __slots__ = ('tree','index')
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+    @property
+    def id(self):
+        if(self.index == 0):
+            return 'root'
+        return self.tree.item_names[self.tree.item[self.index]]
+    @property
+    def counter(self):
+        return self.tree.counter[self.index]
+    @property
+    def parent(self):
+        parent = self.tree.parent[self.index]
+        if(parent == -1):
+            return None
+        return array_treeNode(self.tree,parent)
+    @property
+    def nextLink(self):
+        nextNode = self.tree.nextLink[self.index]
+        if(nextNode == -1):
+            return None
+        return array_treeNode(self.tree,nextNode)
+    @property
+    def children(self):
+        children = []
+        child = self.tree.first_child[self.index]
+        while(child != -1):
+            children.append(array_treeNode(self.tree,child))
+            child = self.tree.sibling[child]
+        children.reverse()    # Children are linked newest first. Return them in insertion order like treeNode.
+        return children
+    def disp(self,file,ind=1):
+        '''
+        Displays the node and it's children recursively.
+        Outputs the tree to a file.
+        '''
+        print (' |'*ind, self.id, '-', self.counter,file=file)
+        for child in self.children:
+            child.disp(file,ind+1)
+
+
+class FP_array_tree:
+    '''
+    FP Tree stored as parallel arrays instead of one treeNode object per node.
+    Item names are mapped to dense integer ranks once (item_ids / item_names) and every node is an index into the
+    arrays item, counter, parent, nextLink, first_child and sibling. Index 0 is the root.
+    header_table has the same layout as FP_tree.header_table i,e., item name as key and a list of support value and
+    first node of its linked list as value, only the node is an index here. So FP_growth runs on it unchanged.
+    '''
+    def __init__(self,item_ids=None,item_names=None):
+        '''
+        item_ids and item_names can be shared between trees (conditional trees share the map of their parent) so
+        that every item is ranked only once.
+        '''
+        self.item_ids = {} if item_ids is None else item_ids
+        self.item_names = [] if item_names is None else item_names
+        self.item = array('q',[-1])
+        self.counter = array('q',[0])
+        self.parent = array('q',[-1])
+        self.nextLink = array('q',[-1])
+        self.first_child = array('q',[-1])
+        self.sibling = array('q',[-1])
+        self.header_table = {}
+        self.header_tail = {}   # Last node of every linked list, new nodes are appended in constant time.
+        self.nodeCount = 1
+        self.root = array_treeNode(self,0)
+        self.snapshot = None    # Path of the file when the tree is loaded with load_snapshot.
+
+    def item_id(self,item):
+        '''
+        Returns the integer rank of the item, a new rank is given for an unseen item.
+        '''
+        rank = self.item_ids.get(item)
+        if rank is None:
+            rank = len(self.item_names)
+            self.item_ids[item] = rank
+            self.item_names.append(item)
+        return rank
+
+    def insert(self,itemset,counter):
+        '''
+        Insert the entire item set into FP Tree.
+        Input : 1) itemset - List of items to be inserted.
+                2) Counter - No of such itemsets. i,e., no of times the itemset to be inserted.
+        '''
+        if profiler is not None:
+            profiler.insert(itemset)
+        parent = 0
+        for item in itemset:
+            rank = self.item_id(item)
+            node = self.first_child[parent]
+            while(node != -1 and self.item[node] != rank):
+                node = self.sibling[node]
+            if(node != -1):
+                self.counter[node] += counter
+                self.header_table[item][0] += counter
+            else:
+                node = len(self.item)
+                self.item.append(rank)
+                self.counter.append(counter)
+                self.parent.append(parent)
+                self.nextLink.append(-1)
+                self.first_child.append(-1)
+                self.sibling.append(self.first_child[parent])
+                self.first_child[parent] = node
+                self.nodeCount += 1
+                self.update_header_table(item,node,counter)
+            parent = node
+        return
+
+    def update_header_table(self,item,node,counter):
+        '''
+        Adds the node at the end of the linked list of its item using the tail pointer of the item.
+        '''
+        if item not in self.header_table:
+            self.header_table[item] = [counter,node]
+        else:
+            self.header_table[item][0] += counter
+            self.nextLink[self.header_tail[item]] = node
+        self.header_tail[item] = node
+
+    def findPrefixPath(self,node):
+        '''
+        Returns all the id's of the nodes in the path from root to this node.
+        Input: Index of the node to which the path to be found.
+        Output: A List of 2d tuples with path as 1st value and counter as second value.
+        '''
+        all_paths = []
+        while(node != -1):
+            plist = []
+            pnode = self.parent[node]
+            while(pnode != 0):
+                plist.append(self.item_names[self.item[pnode]])
+                pnode = self.parent[pnode]
+            plist.reverse()
+            all_paths.append((plist,self.counter[node]))
+            node = self.nextLink[node]
+        return all_paths
+
+    def find_coditional_pattern_base(self,items=None):
+        '''
+        Output: Dictionary with item as key and tuple of list of paths returned by findPrefix Path method.
+        This coditional_pattern_base is later used for generating frequent patterns.
+        items - Only the conditional pattern bases of these items (in this order), default all of the header table.
+        '''
+        if profiler is not None:
+            start = profiler.clock()
+        conditional_pattern_base = {}
+        for key in (self.header_table if items is None else items):
+            conditional_pattern_base[key] = self.findPrefixPath(self.header_table[key][1])
+        if profiler is not None:
+            profiler.add_time('find_coditional_pattern_base',start)
+        return conditional_pattern_base
+
+    def sum_of_nodes(self,item):
+        '''
+        Calculates the sum of counter values in all nodes of the item. Usefull for debugging.
+        '''
+        sum = 0
+        nextNode = self.header_table[item][1]
+        while(nextNode != -1):
+            sum += self.counter[nextNode]
+            nextNode = self.nextLink[nextNode]
+        return sum
+
+    def conditional_tree(self):
+        '''
+        Returns a new empty FP_array_tree sharing the item ranks of this tree.
+        '''
+        return FP_array_tree(self.item_ids,self.item_names)
+
+    def project(self,item,minsup):
+        '''
+        Builds the conditional FP Tree of item straight from its node links, same as FP_tree.project.
+        Works on the integer ranks, item names are only looked up for inserting into the new tree.
+        '''
+        item_support = {}
+        path = []
+        node = self.header_table[item][1]
+        while(node != -1):
+            counter = self.counter[node]
+            pnode = self.parent[node]
+            while(pnode != 0):
+                path.append(self.item[pnode])
+                pnode = self.parent[pnode]
+            for rank in reversed(path):
+                item_support[rank] = item_support.get(rank,0) + counter
+            path.clear()
+            node = self.nextLink[node]
+        item_rank = {}
+        for rank in sorted(item_support,key=item_support.get,reverse=True):
+            if(item_support[rank] >= minsup):
+                item_rank[rank] = len(item_rank)
+        new_fp_tree = self.conditional_tree()
+        node = self.header_table[item][1]
+        while(node != -1):
+            pnode = self.parent[node]
+            while(pnode != 0):
+                if self.item[pnode] in item_rank:
+                    path.append(self.item[pnode])
+                pnode = self.parent[pnode]
+            if path:
+                path.sort(key=item_rank.get)
+                new_fp_tree.insert([self.item_names[rank] for rank in path],self.counter[node])
+                path.clear()
+            node = self.nextLink[node]
+        return new_fp_tree
+
+    @classmethod
+    def from_tree(cls,fp_tree):
+        '''
+        Converts a tree made of treeNode objects (FP_tree or the prefix tree of a MIS_tree) into an FP_array_tree.
+        The header table, its supports and the order of every node link are kept as they are, so mining the
+        converted tree gives the same results. Nodes which are only reachable through node links or parent
+        links (left behind by pruning) are kept too.
+        '''
+        tree = cls()
+        index = {id(fp_tree.root):0}
+        nodes = [fp_tree.root]
+        def add(node):
+            if id(node) in index:
+                return
+            index[id(node)] = len(nodes)
+            nodes.append(node)
+        position = 0
+        while(position < len(nodes)):         # Breadth first over children.
+            for child in nodes[position].children:
+                add(child)
+            position += 1
+        for item in fp_tree.header_table:
+            tree.item_id(item)
+        for values in fp_tree.header_table.values():
+            node = values[1]
+            while(node):
+                pnode = node
+                while(pnode is not None and id(pnode) not in index):   # Detached nodes and their ancestors.
+                    add(pnode)
+                    pnode = pnode.parent
+                node = node.nextLink
+        for node in nodes[1:]:
+            tree.item.append(tree.item_id(node.id))
+            tree.counter.append(node.counter)
+            tree.parent.append(index[id(node.parent)])
+            tree.nextLink.append(-1)
+            tree.first_child.append(-1)
+            tree.sibling.append(-1)
+        for node in nodes:
+            children = node.children
+            for child in reversed(children):
+                tree.sibling[index[id(child)]] = tree.first_child[index[id(node)]]
+                tree.first_child[index[id(node)]] = index[id(child)]
+        for item,values in fp_tree.header_table.items():
+            node = values[1]
+            tree.header_table[item] = [values[0],index[id(node)] if node else -1]
+            prev = -1
+            while(node):
+                if(prev != -1):
+                    tree.nextLink[prev] = index[id(node)]
+                prev = index[id(node)]
+                node = node.nextLink
+            tree.header_tail[item] = prev
+        tree.nodeCount = fp_tree.nodeCount
+        return tree
+
+
+SNAPSHOT_MAGIC = b'FPSNAP01'
+SNAPSHOT_HEAD = struct.Struct('<8sqq')     # Magic, no of entries in every array, length of the JSON section.
+
+
+def dataset_stamp(pathToDataSet):
+    '''
+    Size and modification time (ns) of the data set file, kept in the meta of a snapshot. A snapshot whose stamp
+    differs was built from an older version of the file and is not used.
+    '''
+    stat = os.stat(pathToDataSet)
+    return [stat.st_size,stat.st_mtime_ns]
+
+
+def save_snapshot(fp_tree,path,meta=None):
+    '''
+    Saves an FP Tree to a file which load_snapshot memory maps.
+    An FP_tree (or the prefix tree of a MIS_tree) is converted with FP_array_tree.from_tree first.
+    Layout: SNAPSHOT_HEAD, a JSON section with the item names, header table (support, first and last node of
+    every linked list), nodeCount and meta, padding up to 8 bytes and then the six arrays of the FP_array_tree
+    (item, counter, parent, nextLink, first_child, sibling) as native 8 byte integers.
+    meta - Dictionary saved with the tree, e.g. the data set and minSup it was built for.
+    '''
+    if not isinstance(fp_tree,FP_array_tree):
+        fp_tree = FP_array_tree.from_tree(fp_tree)
+    header = []
+    for item,values in fp_tree.header_table.items():
+        header.append([item,values[0],values[1],fp_tree.header_tail.get(item,-1)])
+    table = json.dumps({'byteorder':sys.byteorder,'nodeCount':fp_tree.nodeCount,
+                        'item_names':fp_tree.item_names,'header_table':header,'meta':meta or {}}).encode('utf-8')
+    table += b' '*(-(SNAPSHOT_HEAD.size + len(table)) % 8)     # Arrays start 8 byte aligned.
+    with open(path,'wb') as file:
+        file.write(SNAPSHOT_HEAD.pack(SNAPSHOT_MAGIC,len(fp_tree.item),len(table)))
+        file.write(table)
+        for values in (fp_tree.item,fp_tree.counter,fp_tree.parent,fp_tree.nextLink,fp_tree.first_child,fp_tree.sibling):
+            file.write(array('q',values).tobytes())
+
+
+def load_snapshot(path):
+    '''
+    Loads a file written by save_snapshot without reading the arrays, they are views into a read only memory
+    map of the file. Pages are read by the OS only when mining touches them and processes loading the same file
+    share them. The tree can be mined (FP_growth, MMS FP_growth, project) but not inserted into.
+    Output: (FP_array_tree, meta). tree.snapshot is the path it was loaded from.
+    '''
+    with open(path,'rb') as file:
+        buffer = mmap.mmap(file.fileno(),0,access=mmap.ACCESS_READ)
+    magic,size,table_length = SNAPSHOT_HEAD.unpack_from(buffer,0)
+    if(magic != SNAPSHOT_MAGIC):
+        raise ValueError("Not an FP Tree snapshot: " + str(path))
+    table = json.loads(bytes(buffer[SNAPSHOT_HEAD.size:SNAPSHOT_HEAD.size + table_length]))
+    if(table['byteorder'] != sys.byteorder):
+        raise ValueError("FP Tree snapshot was saved with a different byte order: " + str(path))
+    item_names = table['item_names']
+    tree = FP_array_tree({item:rank for rank,item in enumerate(item_names)},item_names)
+    view = memoryview(buffer)
+    offset = SNAPSHOT_HEAD.size + table_length
+    arrays = []
+    for i in range(6):
+        arrays.append(view[offset:offset + 8*size].cast('q'))
+        offset += 8*size
+    tree.item,tree.counter,tree.parent,tree.nextLink,tree.first_child,tree.sibling = arrays
+    for item,support,first,tail in table['header_table']:
+        tree.header_table[item] = [support,first]
+        tree.header_tail[item] = tail
+    tree.nodeCount = table['nodeCount']
+    tree.snapshot = path
+    return tree,table['meta']
+
+
+class count_sink:
+    '''
+    Pattern sink which only counts the patterns given to it. Used when only statistics are needed.
+    Every sink has emit(pattern,support) which is called by FP_growth for every frequent pattern as soon as it is
+    found, and close(). Sinks never keep the patterns in memory.
+    '''
+    needs_patterns = False
+    def __init__(self,path=None):
+        self.path = path
+        self.count = 0
+    def emit(self,pattern,support):
+        self.count += 1
+    def emit_count(self,count):
+        '''
+        Counts count patterns without seeing them. Only for sinks with needs_patterns False.
+        '''
+        self.count += count
+    def merge(self,path,count):
+        '''
+        Adds the patterns written by a sink of the same kind to path (a worker of parallel_FP_growth).
+        count is the no of patterns in that file.
+        '''
+        self.count += count
+    def close(self):
+        pass
+
+
+class text_sink(count_sink):
+    '''
+    Writes every pattern as one line in SPMF format i,e., items separated by space followed by #SUP: support.
+    '''
+    needs_patterns = True
+    def __init__(self,path):
+        count_sink.__init__(self,path)
+        self.file = open(path,'w',buffering=1<<20)
+    def emit(self,pattern,support):
+        self.count += 1
+        self.file.write(' '.join(pattern) + ' #SUP: ' + str(support) + '\n')
+    def merge(self,path,count):
+        self.count += count
+        with open(path,'r') as part:
+            shutil.copyfileobj(part,self.file,1<<20)
+    def close(self):
+        self.file.close()
+
+
+class binary_sink(count_sink):
+    '''
+    Writes the patterns in a compact binary format. Items are written as integer ids, the name of an item is
+    written once (record I) the first time it appears in a pattern. Record P is a pattern:
+        I : b'I', id (uint32), length of the name (uint16), name in utf-8
+        P : b'P', no of items (uint16), item ids (uint32 each), support (int64)
+    Only the item ids are kept in memory. read_binary_patterns reads the file back.
+    '''
+    needs_patterns = True
+    def __init__(self,path):
+        count_sink.__init__(self,path)
+        self.file = open(path,'wb',buffering=1<<20)
+        self.item_ids = {}
+    def write_pattern(self,pattern,support):
+        ids = []
+        for item in pattern:
+            item_id = self.item_ids.get(item)
+            if item_id is None:
+                item_id = len(self.item_ids)
+                self.item_ids[item] = item_id
+                name = item.encode('utf-8')
+                self.file.write(b'I' + struct.pack('<IH',item_id,len(name)) + name)
+            ids.append(item_id)
+        self.file.write(b'P' + struct.pack('<H%dIq' % len(ids),len(ids),*ids,support))
+    def emit(self,pattern,support):
+        self.count += 1
+        self.write_pattern(pattern,support)
+    def merge(self,path,count):
+        self.count += count
+        for pattern,support in read_binary_patterns(path):   # Item ids of the part file are its own.
+            self.write_pattern(pattern,support)
+    def close(self):
+        self.file.close()
+
+
+def read_binary_patterns(path):
+    '''
+    Reads a file written by binary_sink.
+    Output: Yields every pattern as a tuple of item names and its support.
+    '''
+    item_names = {}
+    with open(path,'rb') as file:
+        while True:
+            record = file.read(1)
+            if not record:
+                break
+            if(record == b'I'):
+                item_id,length = struct.unpack('<IH',file.read(6))
+                item_names[item_id] = file.read(length).decode('utf-8')
+            else:
+                length = struct.unpack('<H',file.read(2))[0]
+                values = struct.unpack('<%dIq' % length,file.read(4*length + 8))
+                yield tuple(item_names[item_id] for item_id in values[:-1]),values[-1]
+
+
+def open_sink(output_format,path):
+    '''
+    Returns the pattern sink for output_format, one of 'count', 'text' or 'binary'.
+    '''
+    if(output_format == 'count'):
+        return count_sink()
+    elif(output_format == 'text'):
+        return text_sink(path)
+    elif(output_format == 'binary'):
+        return binary_sink(path)
+    raise ValueError("Unknown output format: " + str(output_format))
+
+
+def output_patterns(output_file,patterns,prefix,count):
+    '''
+    Gives the patterns of a single prefix path (generate_patterns) to the sink output_file. count is the no of
+    patterns, a count only sink takes just the count and the patterns are never generated.
+    The empty prefix (whole tree is a single path) is counted by FP_growth but not given to the sink.
+    '''
+    if not output_file.needs_patterns:
+        output_file.emit_count(count if prefix else count - 1)
+        return
+    for pattern,support in patterns:
+        if pattern:
+            output_file.emit(pattern,support)
 
 
 # In[76]:
 
 
+def single_path(root):
+    '''
+    Returns the nodes of a single prefix path tree as a list of (item, counter) from the root downwards.
+    '''
+    path = []
+    while(root.children):
+        root = root.children[0]
+        path.append((root.id,root.counter))
+    return path
+
+
 def generate_patterns(root,prefix,prefix_sup,minsup):
     '''
-    Generate all the Frequent Patterns.
+    Generate all the Frequent Patterns of a single prefix path tree, lazily.
+    Yields the prefix itself and then prefix + every combination of the path nodes, each with its support which is
+    the minimum counter among the nodes in it (prefix_sup for the prefix). Only the path is kept in memory.
+    '''
+    prefix = tuple(prefix)
+    yield prefix,prefix_sup
+    path = single_path(root)
+    for i in range(1,len(path) + 1):
+        for tup in itertools.combinations(path, i):
+            sup = min(counter for item,counter in tup)
+            if prefix:
+                sup = min(sup,prefix_sup)
+            yield prefix + tuple(item for item,counter in tup),sup
+
+
+def count_patterns(root,prefix,prefix_sup):
+    '''
+    No of patterns generate_patterns yields, in closed form. Every subset of the k path nodes is a pattern together
+    with the prefix, so the count is 2^k. Nothing is enumerated.
     '''
-    subsets = {}
-    nodes_list = {}
-    subsets[tuple(prefix)]= prefix_sup
-    if not root.children:
-        return len(subsets),subsets
+    k = 0
     while(root.children):
-        node = root.children[0]
-        nodes_list[node.id] = node.counter
-        root = node
-    p_nodes = list(nodes_list.keys())
-    for item in prefix:                     
-        nodes_list[item] = prefix_sup
-    for i in range(1,len(p_nodes) + 1):
-        apex = list(itertools.combinations(p_nodes, i))
-        after_list = [tuple([x for x in prefix] + list(tup)) for tup in apex]
-        for fpattern in after_list:
-            all_sup = []
-            for item in fpattern:
-                all_sup.append(nodes_list[item])
-            sup = min(all_sup)
-            subsets[fpattern] = sup
-    return len(subsets),subsets
+        root = root.children[0]
+        k += 1
+    return 2**k
 
 
 # In[77]:
@@ -256,7 +1217,11 @@ def del_infrequent(conditional_pattern_base,minsup):
     This is an enhancing the conditional Pattern Base before building Tree.
     Because of this conditional patterns are modified such that node with high support appears first just to 
     satisfy the property of FP Tree.
+    Paths which are equal after removing the items are inserted once with their counters added, the tree built
+    from them is the same.
     '''
+    if profiler is not None:
+        start = profiler.clock()
     result = {}
     for key,values in conditional_pattern_base.items():
         item_support = {}
@@ -273,7 +1238,7 @@ def del_infrequent(conditional_pattern_base,minsup):
         for tkey ,tvalue in item_support.items():
             if(tvalue < minsup):
                 itemslist.remove(tkey)
-        patterns = []
+        patterns = {}   # Equal paths are merged into one (path, sum of counters), in the order they first appear.
         for qtuple in values:
             item_list = list(qtuple[0])
             counter = qtuple[1]
@@ -281,81 +1246,795 @@ def del_infrequent(conditional_pattern_base,minsup):
             for k in itemslist:
                 if k in item_list:
                     new_list.append(k)
-            patterns.append((tuple(new_list),counter))
-        result[key] = patterns
+            new_list = tuple(new_list)
+            patterns[new_list] = patterns.get(new_list,0) + counter
+        result[key] = list(patterns.items())
+    if profiler is not None:
+        profiler.add_time('del_infrequent',start)
     return result
 
 
 # In[79]:
 
 
-def FP_growth(fp_tree,prefix,prefix_sup,output_file,minsup):
+def FP_growth(fp_tree,prefix,prefix_sup,output_file,minsup,projection=False):
     '''
     Final FP Growth Alogrithm.
     Generates Patterns if Tree is a single prefix path.
     If tree is not a single prefix path then conditional pattern base is generated and key is added to the 
     Prefix. Again FP tree is build on the conditional Pattern Base. A recursive step.
+    output_file - A pattern sink (count_sink, text_sink, binary_sink) which gets every pattern, or None.
+    projection - Build every conditional FP Tree directly from the node links (FP_tree.project) instead of
+                 making the conditional pattern base. Same results.
     '''
+    if profiler is not None:
+        profiler.enter(prefix)
     count = 0;
     no_of_nodes = 0;
     if(check_for_single_prefix_path(fp_tree.root)):
-        count,frequent_patterns = generate_patterns(fp_tree.root,prefix,prefix_sup,minsup)
-        if frequent_patterns:
-            pass
-#             print(frequent_patterns)
+        count = count_patterns(fp_tree.root,prefix,prefix_sup)
+        if output_file is not None:
+            output_patterns(output_file,generate_patterns(fp_tree.root,prefix,prefix_sup,minsup),prefix,count)
+        if profiler is not None:
+            profiler.exit(prefix,fp_tree.nodeCount,count,fp_tree.nodeCount)
         return count,fp_tree.nodeCount
     else:
         if prefix:
             count += 1
 #             print({tuple(prefix):prefix_sup})      # Very Important do not delete. Print an important pattern
-        conditional_pattern_base = fp_tree.find_coditional_pattern_base();
-        conditional_pattern_base = del_infrequent(conditional_pattern_base,minsup)  # Very important step to enhance the code.
+            if output_file is not None:
+                output_file.emit(tuple(prefix),prefix_sup)
+        if projection:
+            conditional_pattern_base = dict.fromkeys(fp_tree.header_table)
+        else:
+            conditional_pattern_base = fp_tree.find_coditional_pattern_base();
+            conditional_pattern_base = del_infrequent(conditional_pattern_base,minsup)  # Very important step to enhance the code.
         for key,values in conditional_pattern_base.items():
             prefix_sup = fp_tree.header_table[key][0]
             header_table_child = {}
-            new_fp_tree = FP_tree()
-            for qtuple in values:
-                itemset = qtuple[0]
-                counter = qtuple[1]
-                new_fp_tree.insert(itemset,counter)
+            if projection:
+                new_fp_tree = fp_tree.project(key,minsup)
+            else:
+                new_fp_tree = fp_tree.conditional_tree()
+                for qtuple in values:
+                    itemset = qtuple[0]
+                    counter = qtuple[1]
+                    new_fp_tree.insert(itemset,counter)
             prefix.append(key)
             pre = prefix.copy()
             prefix.remove(key)
-            a,b = FP_growth(new_fp_tree,pre,prefix_sup,output_file,minsup)
+            a,b = FP_growth(new_fp_tree,pre,prefix_sup,output_file,minsup,projection)
             count += a
             no_of_nodes += b
-            
+    if profiler is not None:
+        profiler.exit(prefix,fp_tree.nodeCount,count,no_of_nodes)
     return count,no_of_nodes
 
 
+def iterative_FP_growth(fp_tree,output_file,minsup,projection=False,order='depth'):
+    '''
+    Non recursive FP_growth(fp_tree,[],0,output_file,minsup,projection), gives the same (count, no_of_nodes) and
+    works for any depth. The work is a stack of frames, one per open tree: (conditional pattern base or tree,
+    prefix, items left, supports of the items, empty tree to build children from).
+    Conditional trees are built one at a time when their item is taken from the stack. Without projection a
+    tree is freed as soon as its conditional pattern base is made, with projection when its last child is
+    projected, and the base of every item is freed when its tree is built.
+    order - 'depth' takes the items in the order of FP_growth so the patterns come out in the same order.
+            'memory' takes the biggest item of every frame first (biggest conditional pattern base, or support
+            with projection), so that the frames waiting on the stack hold as little as possible.
+    '''
+    if(order not in ('depth','memory')):
+        raise ValueError("Unknown order: " + str(order))
+    count = 0
+    no_of_nodes = 0
+    stack = []
+    tree,prefix,prefix_sup = fp_tree,[],0
+    while True:
+        if(check_for_single_prefix_path(tree.root)):
+            a = count_patterns(tree.root,prefix,prefix_sup)
+            if output_file is not None:
+                output_patterns(output_file,generate_patterns(tree.root,prefix,prefix_sup,minsup),prefix,a)
+            count += a
+            no_of_nodes += tree.nodeCount
+        else:
+            if prefix:
+                count += 1
+                if output_file is not None:
+                    output_file.emit(tuple(prefix),prefix_sup)
+            supports = {}
+            for key,values in tree.header_table.items():
+                supports[key] = values[0]
+            if projection:
+                source = tree
+                size = supports
+            else:
+                source = del_infrequent(tree.find_coditional_pattern_base(),minsup)
+                size = {key:sum(len(qtuple[0]) for qtuple in values) for key,values in source.items()}
+            keys = list(supports) if projection else list(source)
+            if(order == 'memory'):
+                keys.sort(key=size.get,reverse=True)
+            keys.reverse()      # Taken from the end.
+            if keys:
+                stack.append((source,prefix,keys,supports,tree.conditional_tree()))
+        tree = None
+        if not stack:
+            break
+        source,parent_prefix,keys,supports,empty_tree = stack[-1]
+        key = keys.pop()
+        if not keys:
+            stack.pop()         # Last item, the frame is freed before its subtree is mined.
+        if projection:
+            tree = source.project(key,minsup)
+        else:
+            tree = empty_tree.conditional_tree()
+            for qtuple in source.pop(key):
+                tree.insert(qtuple[0],qtuple[1])
+        source = None
+        prefix = parent_prefix + [key]
+        prefix_sup = supports[key]
+    return count,no_of_nodes
 
 
-def main(pathToDataSet,minSup):
+def mine_conditional_pattern_base(key,values,prefix_sup,new_fp_tree,minsup,sink_class=None,part_path=None,
+                                  projection=False):
     '''
-    Inputs: pathToDataSet - Absolute path to the data set.
-            minSup - min support value in percentage.
+    Worker of parallel_FP_growth, runs in a worker process.
+    Builds the conditional FP Tree of one item from its conditional pattern base (already passed through
+    del_infrequent) into the empty tree new_fp_tree and mines it with FP_growth.
+    If sink_class is given the patterns are written to part_path by a sink of that class.
+    Output: (count, no_of_nodes) of FP_growth.
+    '''
+    for qtuple in values:
+        new_fp_tree.insert(qtuple[0],qtuple[1])
+    output_file = sink_class(part_path) if sink_class else None
+    result = FP_growth(new_fp_tree,[key],prefix_sup,output_file,minsup,projection)
+    if output_file is not None:
+        output_file.close()
+    return result
+
+
+worker_snapshots = {}    # Trees loaded by load_snapshot in a worker process of parallel_FP_growth, by path.
+
+
+def mine_snapshot_item(snapshot,key,minsup,sink_class=None,part_path=None,projection=False):
+    '''
+    Worker of parallel_FP_growth for a tree loaded with load_snapshot. The worker maps the snapshot itself (once
+    per process) and projects the conditional FP Tree of key from it, so no conditional pattern base is pickled
+    and all the workers share the pages of the file.
+    Output: (count, no_of_nodes) of FP_growth.
+    '''
+    if snapshot not in worker_snapshots:
+        worker_snapshots[snapshot] = load_snapshot(snapshot)[0]
+    fp_tree = worker_snapshots[snapshot]
+    output_file = sink_class(part_path) if sink_class else None
+    result = FP_growth(fp_tree.project(key,minsup),[key],fp_tree.header_table[key][0],output_file,minsup,projection)
+    if output_file is not None:
+        output_file.close()
+    return result
+
+
+def part_paths(output_file,no_of_parts):
+    '''
+    Temporary file paths for the workers of parallel_FP_growth to write their patterns into, one per task.
+    Output: (temporary directory, list of paths). Paths are None when there is no sink.
+    '''
+    if output_file is None:
+        return None,[None]*no_of_parts
+    part_dir = tempfile.mkdtemp(prefix='fp_growth_')
+    return part_dir,[os.path.join(part_dir,'part' + str(i)) for i in range(no_of_parts)]
+
+
+def parallel_FP_growth(fp_tree,output_file,minsup,workers=None,projection=False):
+    '''
+    Parallel version of FP_growth(fp_tree,[],0,output_file,minsup), gives the same (count, no_of_nodes).
+    The conditional pattern base of every item in the header table is mined independently in a process pool.
+    Items are submitted biggest conditional pattern base first so that the long tasks do not end up last.
+    Every worker writes its patterns to its own temporary file which is merged into output_file when it is done.
+    A tree loaded with load_snapshot is not sent to the workers at all, they map the file (see mine_snapshot_item).
+    workers - No of processes, defaults to the no of CPUs.
+    projection - Passed to FP_growth in the workers.
+    '''
+    if(check_for_single_prefix_path(fp_tree.root)):
+        return FP_growth(fp_tree,[],0,output_file,minsup,projection)
+    snapshot = getattr(fp_tree,'snapshot',None)
+    if snapshot:        # Workers project from the mapped file, the item with most support goes first.
+        tasks = sorted(fp_tree.header_table.items(),key=lambda kv: kv[1][0],reverse=True)
+    else:
+        conditional_pattern_base = fp_tree.find_coditional_pattern_base()
+        conditional_pattern_base = del_infrequent(conditional_pattern_base,minsup)
+        tasks = sorted(conditional_pattern_base.items(),key=lambda kv: sum(len(qtuple[0]) for qtuple in kv[1]),reverse=True)
+    sink_class = type(output_file) if output_file is not None else None
+    part_dir,paths = part_paths(output_file,len(tasks))
+    count = 0
+    no_of_nodes = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for (key,values),path in zip(tasks,paths):
+            if snapshot:
+                future = executor.submit(mine_snapshot_item,snapshot,key,minsup,sink_class,path,projection)
+            else:
+                future = executor.submit(mine_conditional_pattern_base,key,values,fp_tree.header_table[key][0],
+                                         fp_tree.conditional_tree(),minsup,sink_class,path,projection)
+            futures[future] = path
+        for future in as_completed(futures):
+            a,b = future.result()
+            count += a
+            no_of_nodes += b
+            if output_file is not None:
+                output_file.merge(futures[future],a)
+    if part_dir:
+        shutil.rmtree(part_dir)
+    return count,no_of_nodes
+
+
+PARTITION_RECORD = struct.Struct('<Iqq')    # No of items, weight and first transaction of a partition record.
+
+
+class partition_writer:
+    '''
+    Writes records (tuple of item ranks, weight, first transaction) of partition_FP_growth to the partition file
+    of their last item, a file in part_dir named by its rank:
+        no of items (uint32), weight (int64), first transaction (int64), item ranks (uint32 each)
+    Records wait in memory until buffer_bytes of them are waiting and are then appended to their files, so the
+    no of open files stays one however many items there are.
+    '''
+    def __init__(self,part_dir,buffer_bytes):
+        self.part_dir = part_dir
+        self.buffer_bytes = buffer_bytes
+        self.buffers = {}
+        self.buffered = 0
+    def path(self,rank):
+        return os.path.join(self.part_dir,str(rank))
+    def write(self,ranks,weight,first):
+        record = PARTITION_RECORD.pack(len(ranks),weight,first) + struct.pack('<%dI' % len(ranks),*ranks)
+        buffer = self.buffers.get(ranks[-1])
+        if buffer is None:
+            buffer = self.buffers[ranks[-1]] = bytearray()
+        buffer += record
+        self.buffered += len(record)
+        if(self.buffered >= self.buffer_bytes):
+            self.close()
+    def flush(self,rank):
+        '''
+        Appends the waiting records of rank to its file. Output: Path of the file.
+        '''
+        buffer = self.buffers.pop(rank,None)
+        if buffer:
+            with open(self.path(rank),'ab') as file:
+                file.write(buffer)
+            self.buffered -= len(buffer)
+        return self.path(rank)
+    def close(self):
+        for rank in list(self.buffers):
+            self.flush(rank)
+
+
+def read_partition(path):
+    '''
+    Reads a partition file written by partition_writer.
+    Output: Yields every record as (tuple of item ranks, weight, first transaction).
+    '''
+    with open(path,'rb',buffering=1<<20) as file:
+        while True:
+            head = file.read(PARTITION_RECORD.size)
+            if not head:
+                break
+            length,weight,first = PARTITION_RECORD.unpack(head)
+            yield struct.unpack('<%dI' % length,file.read(4*length)),weight,first
+
+
+def write_partitions(records,part_dir,buffer_bytes):
+    '''
+    Writes records (tuple of item ranks in rank order, weight, first transaction) to the partition files of
+    part_dir and checks if the FP Tree of the records would be a single path, i,e., every record is a prefix of
+    the longest one.
+    Output: Dictionary of record -> weight of all the records if the tree is a single path (at most one record
+            per item), None if it is not.
+    '''
+    writer = partition_writer(part_dir,buffer_bytes)
+    path = {}
+    longest = ()
+    for ranks,weight,first in records:
+        if not ranks:
+            continue
+        writer.write(ranks,weight,first)
+        if path is not None:
+            if(len(ranks) > len(longest)):
+                shorter,longest = longest,ranks
+            else:
+                shorter = ranks
+            if(shorter == longest[:len(shorter)]):
+                path[ranks] = path.get(ranks,0) + weight
+            else:
+                path = None
+    writer.close()
+    return path
+
+
+def single_path_tree(path,names):
+    '''
+    Builds the FP Tree of the records of write_partitions when it is a single path.
+    '''
+    fp_tree = FP_tree()
+    for ranks,weight in path.items():
+        fp_tree.insert([names[rank] for rank in ranks],weight)
+    return fp_tree
+
+
+def conditional_ranks(item_support,item_first,minsup):
+    '''
+    Ranks the items with conditional support (item_support) at least minsup, highest support first. Items with
+    equal support keep the order del_infrequent gives them, the order in which the node links of the tree would
+    reach them. item_first has (first transaction, rank) of the first record with the item for every item.
+    Output: Dictionary of item rank -> new rank.
+    '''
+    new_rank = {}
+    for rank in sorted(item_support,key=lambda rank: (-item_support[rank],item_first[rank])):
+        if(item_support[rank] >= minsup):
+            new_rank[rank] = len(new_rank)
+    return new_rank
+
+
+def count_partition(records):
+    '''
+    Output: Conditional supports and item_first (see conditional_ranks) of records, an iterable of
+            (tuple of item ranks, weight, first transaction).
+    '''
+    item_support = {}
+    item_first = {}
+    for ranks,weight,first in records:
+        for rank in ranks:
+            item_support[rank] = item_support.get(rank,0) + weight
+            if(rank not in item_first or first < item_first[rank][0]):
+                item_first[rank] = (first,rank)
+    return item_support,item_first
+
+
+def mine_partition(records,names,prefix,prefix_sup,output_file,minsup):
+    '''
+    Builds the conditional FP Tree of a partition loaded in memory and mines it with FP_growth.
+    records - List of the records of the partition without their last item, equal ones merged, in the order of
+              their first transaction. That is the order of the node links of the item in the FP Tree, so the
+              tree is the one FP_growth builds for the item.
+    '''
+    item_support,item_first = count_partition(records)
+    new_rank = conditional_ranks(item_support,item_first,minsup)
+    paths = {}
+    for ranks,weight,first in records:
+        path = tuple(sorted([rank for rank in ranks if rank in new_rank],key=new_rank.get))
+        paths[path] = paths.get(path,0) + weight
+    fp_tree = FP_tree()
+    for path,weight in paths.items():
+        if path:
+            fp_tree.insert([names[rank] for rank in path],weight)
+    paths = None
+    return FP_growth(fp_tree,prefix,prefix_sup,output_file,minsup)
+
+
+def mine_partitions(part_dir,names,supports,prefix,output_file,minsup,memory_budget):
+    '''
+    Mines the partition files of part_dir like FP_growth mines the items of a tree which is not a single path,
+    least frequent item first. names and supports are the item name and support of every rank.
+    The partition of an item has every record with the item cut after it, i,e., its conditional pattern base.
+    After the item is mined its records are cut before it and appended to the partition of their new last item,
+    so the partitions together never take more disk than the data set.
+    A partition file up to memory_budget bytes is loaded and mined with FP_tree and FP_growth. A bigger one is
+    split into partitions of its own in a sub directory and mined again with mine_partitions.
+    Output: (count, no_of_nodes) same as FP_growth.
+    '''
+    writer = partition_writer(part_dir,max(memory_budget//4,1))
+    count = 0
+    no_of_nodes = 0
+    for rank in range(len(names) - 1,-1,-1):
+        path = writer.flush(rank)
+        if not os.path.exists(path):
+            continue
+        new_prefix = prefix + [names[rank]]
+        if(os.path.getsize(path) <= memory_budget):
+            records = {}
+            for ranks,weight,first in read_partition(path):
+                ranks = ranks[:-1]
+                if ranks in records:
+                    records[ranks][0] += weight
+                    records[ranks][1] = min(records[ranks][1],first)
+                else:
+                    records[ranks] = [weight,first]
+            os.remove(path)
+            records = sorted([(ranks,weight,first) for ranks,(weight,first) in records.items()],
+                             key=lambda record: record[2])
+            for ranks,weight,first in records:
+                if ranks:
+                    writer.write(ranks,weight,first)
+            a,b = mine_partition(records,names,new_prefix,supports[rank],output_file,minsup)
+        else:
+            a,b = mine_big_partition(path,writer,names,new_prefix,supports[rank],output_file,minsup,memory_budget)
+            os.remove(path)
+        count += a
+        no_of_nodes += b
+    writer.close()
+    return count,no_of_nodes
+
+
+def mine_big_partition(path,writer,names,prefix,prefix_sup,output_file,minsup,memory_budget):
+    '''
+    Mines a partition file bigger than memory_budget without loading it. The first read counts the conditional
+    supports, the second one appends every record cut before its last item to writer (the partitions of
+    mine_partitions) and writes the record ordered by the conditional ranks to the partitions of a sub directory.
+    '''
+    item_support,item_first = count_partition((ranks[:-1],weight,first) for ranks,weight,first in read_partition(path))
+    new_rank = conditional_ranks(item_support,item_first,minsup)
+    new_names = [names[rank] for rank in new_rank]
+    new_supports = [item_support[rank] for rank in new_rank]
+    def records():
+        for ranks,weight,first in read_partition(path):
+            ranks = ranks[:-1]
+            if ranks:
+                writer.write(ranks,weight,first)
+            yield tuple(sorted([new_rank[rank] for rank in ranks if rank in new_rank])),weight,first
+    part_dir = tempfile.mkdtemp(prefix='partition_',dir=os.path.dirname(path))
+    try:
+        single_path = write_partitions(records(),part_dir,max(memory_budget//4,1))
+        if single_path is not None:
+            return FP_growth(single_path_tree(single_path,new_names),prefix,prefix_sup,output_file,minsup)
+        if output_file is not None:
+            output_file.emit(tuple(prefix),prefix_sup)
+        a,b = mine_partitions(part_dir,new_names,new_supports,prefix,output_file,minsup,memory_budget)
+        return a + 1,b
+    finally:
+        shutil.rmtree(part_dir)
+
+
+def partition_FP_growth(pathToDataSet,minSup,output_file=None,memory_budget=64<<20,work_dir=None,
+                        data_format='text'):
+    '''
+    Out of core FP_growth by partition projection, for data sets whose FP Tree does not fit in memory.
+    After the support counting pass every ordered transaction is written to the partition file of its least
+    frequent item on local disk (see mine_partitions), only the partition being mined is kept in memory.
+    minSup - min support value in percentage.
+    output_file - A pattern sink which gets every pattern, or None. Patterns come least frequent item first.
+    memory_budget - Bytes of a partition file which is loaded at once, also bounds the records waiting to be
+                    written. The FP Tree of a partition takes a few times the size of its file.
+    work_dir - Directory for the partition files, defaults to the temporary directory.
+    data_format - See read_transactions.
+    Output: (count, no_of_nodes, no of transactions), count and no_of_nodes are the same as FP_growth.
+    '''
+    items_support,total_trans = find_support_streaming(pathToDataSet,data_format)
+    minSup = (minSup*total_trans/100)
+    sorted_frequent_items = sort_items_on_Value(remove_less_support_items(items_support,minSup))
+    names = list(sorted_frequent_items)
+    supports = list(sorted_frequent_items.values())
+    item_rank = {}
+    for key in names:
+        item_rank[key] = len(item_rank)
+    def records():
+        itemsets = compress_transactions(ordered_transactions(pathToDataSet,sorted_frequent_items,data_format))
+        for first,(itemset,weight) in enumerate(itemsets):
+            yield tuple([item_rank[item] for item in itemset]),weight,first
+    part_dir = tempfile.mkdtemp(prefix='fp_partitions_',dir=work_dir)
+    try:
+        single_path = write_partitions(records(),part_dir,max(memory_budget//4,1))
+        if single_path is not None:
+            count,no_of_nodes = FP_growth(single_path_tree(single_path,names),[],0,output_file,minSup)
+        else:
+            count,no_of_nodes = mine_partitions(part_dir,names,supports,[],output_file,minSup,memory_budget)
+    finally:
+        shutil.rmtree(part_dir)
+    return count,no_of_nodes,total_trans
+
+
+class result_tree:
+    '''
+    Prefix tree of the itemsets found by FP_close and FP_max (CFI-tree / MFI-tree) used for subset checking.
+    Itemsets are inserted in the global item order item_rank and every node keeps the highest support of the
+    itemsets through it in counter. header_table has item as key and list of its nodes as value.
+    '''
+    def __init__(self,item_rank):
+        self.item_rank = item_rank
+        self.root = treeNode('root',0,None)
+        self.header_table = {}
+        self.child_index = {}   # (parent node, item) -> child node.
+    def insert(self,itemset,support):
+        parent = self.root
+        for item in sorted(itemset,key=self.item_rank.get):
+            node = self.child_index.get((parent,item))
+            if node is None:
+                node = treeNode(item,support,parent)
+                parent.children.append(node)
+                self.child_index[(parent,item)] = node
+                self.header_table.setdefault(item,[]).append(node)
+            elif(node.counter < support):
+                node.counter = support
+            parent = node
+    def has_superset(self,itemset,support=0):
+        '''
+        Checks if an itemset with support at least support containing all the items of itemset is in the tree.
+        Only the nodes of the last item of itemset (in item_rank order) have to be checked, going up to the root.
+        '''
+        items = sorted(itemset,key=self.item_rank.get)
+        if not items:
+            return bool(self.root.children)
+        rest = set(items[:-1])
+        for node in self.header_table.get(items[-1],[]):
+            if(node.counter < support):
+                continue
+            found = 0
+            pnode = node.parent
+            while(pnode is not self.root and found < len(rest)):
+                if pnode.id in rest:
+                    found += 1
+                pnode = pnode.parent
+            if(found == len(rest)):
+                return True
+        return False
+
+
+def FP_close(fp_tree,head,cfi_tree,output_file,minsup,item_rank):
+    '''
+    Closed frequent itemset mining (FPClose) on top of FP_tree.
+    Items of the header table are taken least frequent first (item_rank order, kept in every conditional tree).
+    For an item, the items of its conditional pattern base with the same support as the item are added to the
+    head (closure). If cfi_tree already has a superset with the same support the head and all of its extensions
+    are not closed and the item is skipped, else the head is closed and its conditional FP Tree (without the
+    closure items) is mined.
+    Output: (No of closed patterns, no of nodes of the conditional FP Trees).
+    '''
+    count = 0
+    no_of_nodes = 0
+    for key in sorted(fp_tree.header_table,key=item_rank.get,reverse=True):
+        support = fp_tree.header_table[key][0]
+        if(support < minsup):
+            continue
+        item_support = fp_tree.conditional_supports(key)
+        new_head = head + [key] + [item for item,value in item_support.items() if value == support]
+        if cfi_tree.has_superset(new_head,support):
+            continue
+        cfi_tree.insert(new_head,support)
+        count += 1
+        if output_file is not None:
+            output_file.emit(tuple(new_head),support)
+        item_support = {item:value for item,value in item_support.items() if minsup <= value < support}
+        if item_support:
+            new_fp_tree = fp_tree.project(key,minsup,item_rank,item_support)
+            a,b = FP_close(new_fp_tree,new_head,cfi_tree,output_file,minsup,item_rank)
+            count += a
+            no_of_nodes += b + new_fp_tree.nodeCount
+    return count,no_of_nodes
+
+
+def FP_max(fp_tree,head,mfi_tree,output_file,minsup,item_rank):
+    '''
+    Maximal frequent itemset mining (FPMax) on top of FP_tree.
+    Items of the header table are taken least frequent first (item_rank order, kept in every conditional tree).
+    If mfi_tree already has a superset of head + item + all the frequent items of its conditional pattern base,
+    nothing below the item can be maximal and it is skipped. A single path conditional FP Tree gives exactly one
+    maximal itemset, head + item + the path.
+    Output: (No of maximal patterns, no of nodes of the conditional FP Trees).
+    '''
+    count = 0
+    no_of_nodes = 0
+    for key in sorted(fp_tree.header_table,key=item_rank.get,reverse=True):
+        support = fp_tree.header_table[key][0]
+        if(support < minsup):
+            continue
+        item_support = fp_tree.conditional_supports(key)
+        item_support = {item:value for item,value in item_support.items() if value >= minsup}
+        new_head = head + [key]
+        if mfi_tree.has_superset(new_head + list(item_support)):
+            continue
+        new_fp_tree = fp_tree.project(key,minsup,item_rank,item_support)
+        no_of_nodes += new_fp_tree.nodeCount
+        if(check_for_single_prefix_path(new_fp_tree.root)):
+            node = new_fp_tree.root
+            while(node.children):
+                node = node.children[0]
+                new_head.append(node.id)
+                support = node.counter
+            mfi_tree.insert(new_head,support)
+            count += 1
+            if output_file is not None:
+                output_file.emit(tuple(new_head),support)
+        else:
+            a,b = FP_max(new_fp_tree,new_head,mfi_tree,output_file,minsup,item_rank)
+            count += a
+            no_of_nodes += b
+    return count,no_of_nodes
+
+
+class top_k_heap:
+    '''
+    Bounded min heap of the k most frequent patterns found so far.
+    minsup is the support a pattern needs to get into the heap. It starts at the given value and is raised to the
+    smallest support in the heap once the heap is full, so mining prunes harder as better patterns are found.
+    Patterns with the same support as the smallest one in a full heap do not replace it.
+    '''
+    def __init__(self,k,minsup=1):
+        self.k = k
+        self.minsup = minsup
+        self.heap = []
+        self.pushed = 0     # Breaks ties between equal supports in the heap, patterns are never compared.
+    def push(self,pattern,support):
+        if(support < self.minsup):
+            return
+        if(len(self.heap) < self.k):
+            heapq.heappush(self.heap,(support,self.pushed,tuple(pattern)))
+        elif(support > self.heap[0][0]):
+            heapq.heapreplace(self.heap,(support,self.pushed,tuple(pattern)))
+        else:
+            return
+        self.pushed += 1
+        if(len(self.heap) == self.k):
+            self.minsup = max(self.minsup,self.heap[0][0])
+    def patterns(self):
+        '''
+        Output: A list of (pattern, support), most frequent first.
+        '''
+        return [(pattern,support) for support,pushed,pattern in sorted(self.heap,key=lambda x: (-x[0],x[1]))]
+
+
+def top_k_FP_growth(fp_tree,prefix,top_k,min_length=1):
+    '''
+    Top-k frequent pattern mining. Every item of the header table (most frequent first, so that top_k.minsup goes
+    up quickly) extends prefix, the pattern is pushed into top_k if it has at least min_length items and the
+    conditional FP Tree is built with FP_tree.project at the current top_k.minsup. Items and conditional trees
+    below the current minsup are never built.
+    Output: No of nodes of the conditional FP Trees. Patterns are in top_k.
+    '''
+    no_of_nodes = 0
+    for key in sorted(fp_tree.header_table,key=lambda item: fp_tree.header_table[item][0],reverse=True):
+        support = fp_tree.header_table[key][0]
+        if(support < top_k.minsup):
+            continue
+        pattern = prefix + [key]
+        if(len(pattern) >= min_length):
+            top_k.push(pattern,support)
+        new_fp_tree = fp_tree.project(key,top_k.minsup)
+        no_of_nodes += new_fp_tree.nodeCount
+        if new_fp_tree.header_table:
+            no_of_nodes += top_k_FP_growth(new_fp_tree,pattern,top_k,min_length)
+    return no_of_nodes
+
+
+def top_k_main(pathToDataSet,k,min_length=1,indexed=True):
+    '''
+    Finds the k most frequent patterns with at least min_length items, no minimum support is needed.
+    The data set is read in streaming mode. When min_length is 1 the support of the k-th most frequent item is
+    a lower bound of the answer, so items below it are not put in the FP Tree at all.
+    Output: A list of (pattern, support), most frequent first.
+    '''
+    items_support,total_trans = find_support_streaming(pathToDataSet)
+    print("No of Transactions:",total_trans)
+    print("No of Items:",len(items_support))
+    minSup = 1
+    if(min_length <= 1 and len(items_support) >= k):
+        minSup = sorted(items_support.values(),reverse=True)[k - 1]
+    frequent_items = remove_less_support_items(items_support,minSup)
+    sorted_frequent_items = sort_items_on_Value(frequent_items)
+    print("No of Frequent Items:",len(frequent_items))
+    fp_tree = FP_tree(indexed)
+    for itemset,weight in compress_transactions(ordered_transactions(pathToDataSet,sorted_frequent_items)):
+        fp_tree.insert(itemset,weight)
+    top_k = top_k_heap(k,minSup)
+    nodeCount = top_k_FP_growth(fp_tree,[],top_k,min_length)
+    print("Final Minimum Support:",top_k.minsup)
+    print("No of Nodes:",nodeCount)
+    return top_k.patterns()
+
+
+def build_fp_tree(pathToDataSet,minSup,array_tree=False,indexed=False,streaming=False,vectorized=False,
+                  data_format='text'):
+    '''
+    Reads the data set and builds the FP Tree of main, see main for the inputs. minSup is in percentage.
+    Output: (FP Tree, min support count, sorted frequent items, no of transactions).
     '''
     data = []   # Carries list of data and transactions.
-    header_table = {}  # Header Table keeps track of all the nodes of same type.
     total_trans = 0
-    with open(pathToDataSet,'r') as csvfile:
-        plots = csv.reader(csvfile, delimiter=' ')
-        for row in plots:
+    vectorized = vectorized and not streaming
+    if streaming:
+        items_support,total_trans = find_support_streaming(pathToDataSet,data_format)
+    elif vectorized:
+        indptr,indices,item_names = encode_file(pathToDataSet,data_format)
+        total_trans = len(indptr) - 1
+    else:
+        for row in read_transactions(pathToDataSet,data_format):
             data.append(row)
             total_trans += 1
     minSup = (minSup*total_trans/100)      # Percentage => to normal.
     print("No of Transactions:",total_trans)
-    items_support = find_support_for_every_item(data)  # Carries support count for each item.
+    if vectorized:
+        items_support = support_from_matrix(indices,item_names)
+    elif not streaming:
+        items_support = find_support_for_every_item(data)  # Carries support count for each item.
     print("No of Items:",len(items_support))
     frequent_items = remove_less_support_items(items_support,minSup)  # After removing items with less support count.
     sorted_frequent_items = sort_items_on_Value(frequent_items)
-    ordered_dataset = order_items(data,sorted_frequent_items)
+    if streaming:
+        ordered_dataset = ordered_transactions(pathToDataSet,sorted_frequent_items,data_format)
+    elif vectorized:
+        ordered_dataset = order_items_from_matrix(indptr,indices,item_names,sorted_frequent_items)
+    else:
+        ordered_dataset = order_items(data,sorted_frequent_items)
     print("No of Frequent Items:",len(frequent_items))
-    fp_tree = FP_tree()
-    for itemset in ordered_dataset:
-        fp_tree.insert(itemset,1)
-    file = open("output.txt","w+")
-    total_patterns,nodeCount = FP_growth(fp_tree,[],0,file,minSup)
+    fp_tree = FP_array_tree() if array_tree else FP_tree(indexed)
+    for itemset,weight in compress_transactions(ordered_dataset):
+        fp_tree.insert(itemset,weight)
+    return fp_tree,minSup,sorted_frequent_items,total_trans
+
+
+def main(pathToDataSet,minSup,array_tree=False,indexed=False,streaming=False,workers=1,output_format='count',
+         output_path='output.txt',projection=False,vectorized=False,mode='all',snapshot=None,
+         iterative=False,memory_budget=None,data_format='text'):
+    '''
+    Inputs: pathToDataSet - Absolute path to the data set.
+            minSup - min support value in percentage.
+            array_tree - Build the FP Tree as an FP_array_tree instead of treeNode objects.
+            indexed - Build the FP Tree in indexed mode (see FP_tree).
+            streaming - Read the data set twice (support counting, then tree building) instead of loading it.
+                        Only the tree is kept in memory.
+            workers - No of processes used for mining. More than 1 uses parallel_FP_growth.
+            output_format - 'count' only counts the patterns, 'text' and 'binary' write them to output_path
+                            (see text_sink and binary_sink).
+            projection - Build the conditional FP Trees directly from the node links (see FP_growth).
+            vectorized - Count supports and order the transactions on the item matrix of encode_dataset
+                         (NumPy is used when it is installed). Ignored in streaming mode.
+            mode - 'all' frequent patterns, 'closed' (FP_close) or 'maximal' (FP_max) ones. closed and maximal
+                   need an FP_tree, they can not be used with array_tree, workers or snapshot.
+            snapshot - Path of a tree snapshot (see save_snapshot). If it was saved for the same data set and
+                       minSup the tree is loaded from it instead of reading the data set, else the tree is built
+                       and saved to it. The tree is built again when the data set file changed since the snapshot
+                       was saved (see dataset_stamp).
+            iterative - Mine with iterative_FP_growth (no recursion) instead of FP_growth.
+            memory_budget - Mine out of core with partition_FP_growth, no FP Tree of the whole data set is built.
+                            Partition files bigger than memory_budget bytes are split again on disk. Only for
+                            mode 'all' in a single process without snapshot.
+            data_format - 'text', 'fimi' or 'spmf', see read_transactions. Plain, .gz and .zst files are read.
+    '''
+    if(mode not in ('all','closed','maximal')):
+        raise ValueError("Unknown mode: " + str(mode))
+    if(mode != 'all' and (array_tree or workers > 1 or snapshot is not None)):
+        raise ValueError("closed and maximal modes need a single process FP_tree")
+    if(memory_budget is not None):
+        if(mode != 'all' or workers > 1 or snapshot is not None):
+            raise ValueError("memory_budget needs mode all in a single process without snapshot")
+        file = open_sink(output_format,output_path)
+        total_patterns,nodeCount,total_trans = partition_FP_growth(pathToDataSet,minSup,file,memory_budget,
+                                                                   data_format=data_format)
+        print("No of Transactions:",total_trans)
+        print("No of Frequent Patterns:",total_patterns)
+        print("No of Nodes:",nodeCount)
+        file.close()
+        return
+    fp_tree = None
+    if(snapshot is not None and os.path.exists(snapshot)):
+        fp_tree,meta = load_snapshot(snapshot)
+        if(meta.get('dataset') != pathToDataSet or meta.get('minSup') != minSup or
+           meta.get('stamp') != dataset_stamp(pathToDataSet)):
+            fp_tree = None
+        else:
+            total_trans = meta['total_trans']
+            minSup = meta['minsup']
+            print("No of Transactions:",total_trans)
+            print("No of Frequent Items:",len(fp_tree.header_table))
+    if fp_tree is None:
+        meta = {'dataset':pathToDataSet,'minSup':minSup,'stamp':dataset_stamp(pathToDataSet)}
+        fp_tree,minSup,sorted_frequent_items,total_trans = build_fp_tree(pathToDataSet,minSup,array_tree,indexed,
+                                                                         streaming,vectorized,data_format)
+        if snapshot is not None:
+            meta['minsup'] = minSup
+            meta['total_trans'] = total_trans
+            save_snapshot(fp_tree,snapshot,meta)
+    file = open_sink(output_format,output_path)
+    if(mode != 'all'):
+        item_rank = {}
+        for key in sorted_frequent_items.keys():
+            item_rank[key] = len(item_rank)
+        mine = FP_close if mode == 'closed' else FP_max
+        total_patterns,nodeCount = mine(fp_tree,[],result_tree(item_rank),file,minSup,item_rank)
+    elif(workers > 1):
+        total_patterns,nodeCount = parallel_FP_growth(fp_tree,file,minSup,workers,projection)
+    elif iterative:
+        total_patterns,nodeCount = iterative_FP_growth(fp_tree,file,minSup,projection)
+    else:
+        total_patterns,nodeCount = FP_growth(fp_tree,[],0,file,minSup,projection)
     print("No of Frequent Patterns:",total_patterns)
     print("No of Nodes:",nodeCount)
     file.close()
@@ -363,6 +2042,5 @@ def main(pathToDataSet,minSup):
     
     
 if(__name__ == "__main__"):
-    path = '/home/satya/Research/uday/'
-    path += str(sys.argv[1])
-    main(path,float(sys.argv[2]))         #upport in percentage
+    data_format = sys.argv[3] if len(sys.argv) > 3 else 'text'
+    main(sys.argv[1],float(sys.argv[2]),data_format=data_format)         #upport in percentage
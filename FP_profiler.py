@@ -0,0 +1,126 @@
+'''
+Profiling of FP_growth runs. While a profiler is set as FP_growth.profiler, the hooks in FP_growth,
+find_coditional_pattern_base, del_infrequent and FP_tree.insert report to it. Without a profiler every hook is a
+single check of a module global, so the cost of the hooks is close to nothing.
+Usage:
+    with profiling(top_n=10,trace_memory=True) as stats:
+        FP_growth.main(path,minSup)
+    stats.summary()
+Only the process which sets the profiler is profiled, workers of parallel_FP_growth are not.
+'''
+import contextlib
+import heapq
+import sys
+import time
+import tracemalloc
+
+import FP_growth
+
+
+class fp_profiler:
+    def __init__(self,top_n=10,trace_memory=False):
+        '''
+        top_n - No of most expensive subtrees (prefixes) kept for the summary.
+        trace_memory - Measure memory with tracemalloc. Memory is sampled when an FP_growth call starts and ends,
+                       the bytes of a subtree are the highest sample in it minus the sample at its start.
+        depths - Depth (length of the prefix) -> [calls, seconds, patterns, tree nodes] where seconds and
+                 patterns are of the calls themselves without the calls below them.
+        inserts - Depth -> [inserts, items inserted], inserts made while mining at that depth build the trees of
+                  the next depth. Depth -1 is the tree built before mining.
+        functions - Name of hooked function -> [calls, seconds].
+        '''
+        self.top_n = top_n
+        self.trace_memory = trace_memory
+        self.clock = time.perf_counter
+        self.depths = {}
+        self.inserts = {}
+        self.functions = {}
+        self.top = []       # Heap of (seconds, order, prefix, patterns, tree nodes, nodes below, bytes).
+        self.stack = []     # [start, sample at start, highest sample, seconds of children, patterns of children].
+        self.calls = 0
+
+    def memory(self):
+        return tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+
+    def enter(self,prefix):
+        memory = self.memory()
+        self.stack.append([self.clock(),memory,memory,0.0,0])
+
+    def exit(self,prefix,tree_nodes,count,no_of_nodes):
+        start,memory,highest,child_seconds,child_count = self.stack.pop()
+        seconds = self.clock() - start
+        highest = max(highest,self.memory())
+        if self.stack:
+            parent = self.stack[-1]
+            parent[2] = max(parent[2],highest)
+            parent[3] += seconds
+            parent[4] += count
+        stats = self.depths.setdefault(len(prefix),[0,0.0,0,0])
+        stats[0] += 1
+        stats[1] += seconds - child_seconds
+        stats[2] += count - child_count
+        stats[3] += tree_nodes
+        self.calls += 1
+        record = (seconds,self.calls,tuple(prefix),count,tree_nodes,no_of_nodes,highest - memory)
+        if(len(self.top) < self.top_n):
+            heapq.heappush(self.top,record)
+        elif(seconds > self.top[0][0]):
+            heapq.heapreplace(self.top,record)
+
+    def insert(self,itemset):
+        stats = self.inserts.setdefault(len(self.stack) - 1,[0,0])
+        stats[0] += 1
+        stats[1] += len(itemset)
+
+    def add_time(self,name,start):
+        stats = self.functions.setdefault(name,[0,0.0])
+        stats[0] += 1
+        stats[1] += self.clock() - start
+
+    def summary(self,file=sys.stdout):
+        '''
+        Writes the statistics per depth, per hooked function and the top_n most expensive subtrees.
+        '''
+        print("%6s %10s %12s %12s %14s %12s %14s" % ("depth","calls","seconds","patterns","tree nodes",
+                                                     "inserts","items inserted"),file=file)
+        for depth in sorted(set(self.depths) | set(self.inserts)):
+            calls,seconds,patterns,tree_nodes = self.depths.get(depth,[0,0.0,0,0])
+            inserts,items = self.inserts.get(depth,[0,0])
+            print("%6d %10d %12.4f %12d %14d %12d %14d" % (depth,calls,seconds,patterns,tree_nodes,inserts,items),
+                  file=file)
+        print(file=file)
+        for name,(calls,seconds) in sorted(self.functions.items()):
+            print("%-30s %10d calls %12.4f s" % (name,calls,seconds),file=file)
+        print(file=file)
+        print("Top %d subtrees by time:" % self.top_n,file=file)
+        for seconds,order,prefix,count,tree_nodes,no_of_nodes,memory in sorted(self.top,reverse=True):
+            line = "%12.4f s %10d patterns %10d tree nodes %10d nodes below" % (seconds,count,tree_nodes,no_of_nodes)
+            if self.trace_memory:
+                line += " %12d bytes" % memory
+            print(line," ".join(prefix) if prefix else "(root)",file=file)
+
+
+@contextlib.contextmanager
+def profiling(top_n=10,trace_memory=False):
+    '''
+    Sets an fp_profiler as FP_growth.profiler for the with block and gives it to the block.
+    '''
+    stats = fp_profiler(top_n,trace_memory)
+    previous = FP_growth.profiler
+    started = trace_memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    FP_growth.profiler = stats
+    try:
+        yield stats
+    finally:
+        FP_growth.profiler = previous
+        if started:
+            tracemalloc.stop()
+
+
+
+if(__name__ == "__main__"):
+    with profiling(trace_memory=len(sys.argv) > 3 and sys.argv[3] == 'memory') as stats:
+        FP_growth.main(sys.argv[1],float(sys.argv[2]))      # support in percentage
+    stats.summary()
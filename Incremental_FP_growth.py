@@ -0,0 +1,180 @@
+'''
+Incremental maintenance of an FP Tree for data sets which grow and expire in batches (CP-tree style).
+Transactions are added with FP_tree.insert and expired with FP_tree.remove in the current item order. When the
+support order of the items drifts, only the branches whose order became wrong are taken out and inserted again.
+Calling add and expire with restructure=False never reorders anything and keeps the first seen order (CanTree
+style), FP_growth does not need the support order to be correct, only the same order for every path.
+'''
+from FP_growth import FP_tree, FP_growth
+
+
+class incremental_FP_tree:
+    def __init__(self,indexed=True):
+        '''
+        fp_tree has every item of the transactions added so far, not only the frequent ones, so it can be mined
+        at any minimum support. item_rank is the order every path of fp_tree follows.
+        delta_items are the items of the transactions added or expired since the last mine.
+        '''
+        self.fp_tree = FP_tree(indexed)
+        self.items_support = {}
+        self.item_rank = {}
+        self.total_trans = 0
+        self.delta_items = set()
+
+    def order(self,itemset):
+        '''
+        Returns the items of itemset in the order of item_rank, empty items and duplicates removed.
+        '''
+        return sorted(set(item for item in itemset if item != ''),key=self.item_rank.get)
+
+    def add(self,transactions,restructure=True):
+        '''
+        Adds a batch of transactions to the tree.
+        Input: transactions - Iterable of (itemset, weight), weight is the no of such transactions.
+               restructure - Restore the support order after the batch (see restructure).
+        '''
+        for itemset,weight in transactions:
+            for item in itemset:
+                if(item != '' and item not in self.item_rank):
+                    self.item_rank[item] = len(self.item_rank)     # New items go to the end of the order.
+            itemset = self.order(itemset)
+            self.fp_tree.insert(itemset,weight)
+            for item in itemset:
+                self.items_support[item] = self.items_support.get(item,0) + weight
+            self.delta_items.update(itemset)
+            self.total_trans += weight
+        if restructure:
+            self.restructure()
+
+    def expire(self,transactions,restructure=True):
+        '''
+        Removes a batch of transactions which were added before.
+        Input: transactions - Iterable of (itemset, weight).
+               restructure - Restore the support order after the batch (see restructure).
+        The whole batch is checked before anything is removed, if any transaction was not added (as often as it
+        is expired) ValueError is raised and the tree is left as it was.
+        '''
+        batch = []
+        weights = {}
+        for itemset,weight in transactions:
+            for item in itemset:
+                if(item != '' and item not in self.item_rank):     # Never added, it has no rank to sort on.
+                    raise ValueError("Itemset is not in the FP Tree: " + str(itemset))
+            itemset = self.order(itemset)
+            batch.append((itemset,weight))
+            weights[tuple(itemset)] = weights.get(tuple(itemset),0) + weight
+        for itemset,weight in weights.items():
+            if(itemset and self.fp_tree.count_ending(itemset) < weight):
+                raise ValueError("Itemset is not in the FP Tree: " + str(list(itemset)))
+        for itemset,weight in batch:
+            self.fp_tree.remove(itemset,weight)
+            for item in itemset:
+                self.items_support[item] -= weight
+            self.delta_items.update(itemset)
+            self.total_trans -= weight
+        if restructure:
+            self.restructure()
+
+    def restructure(self):
+        '''
+        Makes item_rank the support order again and fixes only the part of the tree where it changed.
+        A path is out of order only where a node and its parent are out of order, and that needs at least one of
+        them to have changed rank. So only the nodes of items whose rank changed are checked. Every branch below
+        the highest such node is taken out of the tree as (itemset, weight) and inserted again in the new order.
+        Output: No of (itemset, weight) inserted again.
+        '''
+        new_rank = {}
+        for item in sorted(self.item_rank,key=lambda item: (-self.items_support.get(item,0),self.item_rank[item])):
+            new_rank[item] = len(new_rank)
+        moved = [item for item in new_rank if new_rank[item] != self.item_rank[item]]
+        if not moved:
+            return 0
+        fp_tree = self.fp_tree
+        wrong = {}      # id of node -> node, for nodes out of order with their parent.
+        for item in moved:
+            if item not in fp_tree.header_table:
+                continue
+            node = fp_tree.header_table[item][1]
+            while(node):
+                if(node.parent is not fp_tree.root and new_rank[node.parent.id] > new_rank[node.id]):
+                    wrong[id(node)] = node
+                for child in node.children:
+                    if(new_rank[item] > new_rank[child.id]):
+                        wrong[id(child)] = child
+                node = node.nextLink
+        branches = []
+        for node in wrong.values():
+            pnode = node.parent
+            while(pnode is not fp_tree.root and id(pnode) not in wrong):
+                pnode = pnode.parent
+            if pnode is fp_tree.root:       # Highest wrong node of its path.
+                branches.append(node)
+        transactions = []
+        empty = []
+        for branch in branches:
+            prefix = []
+            pnode = branch.parent
+            while(pnode is not fp_tree.root):
+                prefix.append(pnode.id)
+                pnode.counter -= branch.counter
+                fp_tree.header_table[pnode.id][0] -= branch.counter
+                if(pnode.counter == 0):
+                    empty.append(pnode)
+                pnode = pnode.parent
+            prefix.reverse()
+            stack = [(branch,prefix + [branch.id])]
+            while stack:
+                node,itemset = stack.pop()
+                fp_tree.header_table[node.id][0] -= node.counter
+                empty.append(node)
+                weight = node.counter - sum(child.counter for child in node.children)
+                if(weight > 0):
+                    transactions.append((itemset,weight))
+                for child in node.children:
+                    stack.append((child,itemset + [child.id]))
+        fp_tree.unlink_nodes(empty)
+        self.item_rank = new_rank
+        for itemset,weight in transactions:
+            fp_tree.insert(sorted(itemset,key=new_rank.get),weight)
+        return len(transactions)
+
+    def mine(self,minsup,output_file=None):
+        '''
+        Mines all the frequent patterns of the tree, minsup is a support count.
+        Items below minsup are skipped here because fp_tree keeps every item.
+        Output: (No of patterns, no of nodes) like FP_growth.
+        '''
+        count = 0
+        no_of_nodes = 0
+        for key,values in list(self.fp_tree.header_table.items()):
+            if(values[0] < minsup):
+                continue
+            a,b = FP_growth(self.fp_tree.project(key,minsup),[key],values[0],output_file,minsup)
+            count += a
+            no_of_nodes += b
+        self.delta_items = set()
+        return count,no_of_nodes
+
+    def mine_delta(self,minsup,output_file=None):
+        '''
+        Mines only the patterns made of delta_items. These are the only patterns whose support can have changed
+        since the last mine, every other pattern keeps its support. A cached result is brought up to date by
+        dropping its patterns made of delta_items and adding the patterns found here. Only the node links of
+        delta_items are walked, so the cost follows the size of the change and not of the whole tree.
+        Output: (No of patterns, no of nodes) like FP_growth.
+        '''
+        count = 0
+        no_of_nodes = 0
+        for key in self.delta_items:
+            if(key not in self.fp_tree.header_table or self.fp_tree.header_table[key][0] < minsup):
+                continue
+            item_support = {}
+            for item,value in self.fp_tree.conditional_supports(key).items():
+                if item in self.delta_items:
+                    item_support[item] = value
+            new_fp_tree = self.fp_tree.project(key,minsup,None,item_support)
+            a,b = FP_growth(new_fp_tree,[key],self.fp_tree.header_table[key][0],output_file,minsup)
+            count += a
+            no_of_nodes += b
+        self.delta_items = set()
+        return count,no_of_nodes
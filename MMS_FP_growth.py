@@ -4,9 +4,14 @@
 # In[1]:
 
 
-import csv
+import os
 import sys
 import itertools
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from FP_growth import FP_array_tree, find_support_streaming, read_transactions, output_patterns, open_sink, part_paths
+from FP_growth import save_snapshot, load_snapshot, dataset_stamp
 
 
 # In[2]:
@@ -97,14 +102,19 @@ class treeNode:
 
 
 class FP_tree:
-    def __init__(self):
+    def __init__(self,indexed=False):
         '''
         header_table is a dictionary where keys are item names and values are a list of support value and nextNode LInk.
         Conventional Header_Table.
+        indexed - Build mode where children are looked up in child_index and new nodes are linked through
+                  header_tail, so inserting an itemset costs time proportional to its length.
         '''
         self.header_table = {}
         self.root =  treeNode('root',0,None)
         self.nodeCount = 1
+        self.indexed = indexed
+        self.child_index = {}   # (parent node, item) -> child node. Only kept in indexed mode.
+        self.header_tail = {}   # item -> last node of its linked list. Only kept in indexed mode.
         
     def insert(self,itemset,counter):
         '''
@@ -113,6 +123,8 @@ class FP_tree:
                 2) Counter - No of such itemsets. i,e., no of times the itemset to be inserted.
         
         '''
+        if self.indexed:
+            return self.insert_indexed(itemset,counter)
         parent = self.root
         itemset = list(itemset) # Just to make it list given in anyform
         for item in itemset:
@@ -133,6 +145,33 @@ class FP_tree:
         return
     
     
+    def insert_indexed(self,itemset,counter):
+        '''
+        Same as insert but child lookup is a dictionary lookup and the new node is added at the tail of its
+        linked list directly. Builds exactly the same tree as insert.
+        The index is only valid while the tree is being built, pruning (MIS_tree) does not update it.
+        '''
+        parent = self.root
+        for item in itemset:
+            node = self.child_index.get((parent,item))
+            if node is not None:
+                node.inc(counter)
+                self.header_table[item][0] += counter
+            else:
+                node = treeNode(item,counter,parent)
+                self.nodeCount += 1
+                parent.children.append(node)
+                self.child_index[(parent,item)] = node
+                if item not in self.header_table:
+                    self.header_table[item] = [counter,node]
+                else:
+                    self.header_table[item][0] += counter
+                    self.header_tail[item].nextLink = node
+                self.header_tail[item] = node
+            parent = node
+        return
+    
+    
     def findPrefixPath(self,node):
         '''
         Returns all the id's of the nodes in the path from root to this node.
@@ -152,12 +191,17 @@ class FP_tree:
         return all_paths
     
     
-    def find_coditional_pattern_base(self):
+    def find_coditional_pattern_base(self,items=None):
         '''
         Output: Dictionary with item as key and tuple of list of paths returned by findPrefix Path method.
         This coditional_pattern_base is later used for generating frequent patterns.
+        items - Only the conditional pattern bases of these items (in this order), default all of the header table.
         '''
         conditional_pattern_base = {}
+        if items is not None:
+            for key in items:
+                conditional_pattern_base[key] = self.findPrefixPath(self.header_table[key][1])
+            return conditional_pattern_base
         for values in self.header_table.values():
             conditional_pattern_base[values[1].id] = self.findPrefixPath(values[1])
         return conditional_pattern_base
@@ -190,6 +234,78 @@ class FP_tree:
             sum += nextNode.counter
             nextNode = nextNode.nextLink
         return sum
+    def conditional_tree(self):
+        '''
+        Returns a new empty tree of the same kind. FP_growth builds the conditional FP Trees through this method
+        so that it works on top of both FP_tree and FP_array_tree.
+        '''
+        return FP_tree(self.indexed)
+    def project(self,item,minsup):
+        '''
+        Builds the conditional FP Tree of item straight from its node links, without making the conditional pattern
+        base. Supports of the items above every node of item are counted while walking the node links, the items
+        with support at least minsup are ranked like del_infrequent does and the second walk inserts every path
+        ordered by that rank. Gives the same tree as inserting the output of del_infrequent for item.
+        '''
+        item_support = {}
+        path = []
+        node = self.header_table[item][1]
+        while(node):
+            pnode = node.parent
+            while(pnode.id != 'root'):
+                path.append(pnode.id)
+                pnode = pnode.parent
+            for pitem in reversed(path):
+                item_support[pitem] = item_support.get(pitem,0) + node.counter
+            path.clear()
+            node = node.nextLink
+        item_rank = {}
+        for key in sorted(item_support,key=item_support.get,reverse=True):
+            if(item_support[key] >= minsup):
+                item_rank[key] = len(item_rank)
+        new_fp_tree = self.conditional_tree()
+        node = self.header_table[item][1]
+        while(node):
+            pnode = node.parent
+            while(pnode.id != 'root'):
+                if pnode.id in item_rank:
+                    path.append(pnode.id)
+                pnode = pnode.parent
+            if path:
+                path.sort(key=item_rank.get)
+                new_fp_tree.insert(path,node.counter)
+                path.clear()
+            node = node.nextLink
+        return new_fp_tree
+
+    def copy(self):
+        '''
+        Returns a copy of the tree with new nodes. Children and node links keep their order, so pruning and mining
+        the copy gives the same results as the tree itself. The index of indexed mode is not copied (see
+        insert_indexed), copies are only pruned and mined.
+        '''
+        new_fp_tree = FP_tree(self.indexed)
+        new_fp_tree.nodeCount = self.nodeCount
+        copies = {id(self.root):new_fp_tree.root}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            parent = copies[id(node)]
+            for child in node.children:
+                new_node = treeNode(child.id,child.counter,parent)
+                parent.children.append(new_node)
+                copies[id(child)] = new_node
+                stack.append(child)
+        for item,values in self.header_table.items():
+            node = values[1]
+            new_node = copies[id(node)] if node else None
+            new_fp_tree.header_table[item] = [values[0],new_node]
+            while(node):
+                next_node = node.nextLink
+                new_node.nextLink = copies[id(next_node)] if next_node else None
+                new_node = new_node.nextLink
+                node = next_node
+        return new_fp_tree
 
 
 # In[7]:
@@ -212,30 +328,34 @@ def sort_items_and_add_support_column(d):
 
 def generate_patterns(root,prefix,prefix_sup):
     '''
-    Generate all the Frequent Patterns.
+    Generate all the Frequent Patterns of a single prefix path tree, lazily.
+    Yields the prefix itself and then prefix + every combination of the path nodes, each with its support which is
+    the minimum counter among the nodes in it (prefix_sup for the prefix). Only the path is kept in memory.
+    '''
+    prefix = tuple(prefix)
+    yield prefix,prefix_sup
+    path = []
+    while(root.children):
+        root = root.children[0]
+        path.append((root.id,root.counter))
+    for i in range(1,len(path) + 1):
+        for tup in itertools.combinations(path, i):
+            sup = min(counter for item,counter in tup)
+            if prefix:
+                sup = min(sup,prefix_sup)
+            yield prefix + tuple(item for item,counter in tup),sup
+
+
+def count_patterns(root,prefix,prefix_sup):
+    '''
+    No of patterns generate_patterns yields, in closed form. Every subset of the k path nodes is a pattern together
+    with the prefix, so the count is 2^k. Nothing is enumerated.
     '''
-    subsets = {}
-    nodes_list = {}
-    subsets[tuple(prefix)]= prefix_sup
-    if not root.children:
-        return len(subsets),subsets
+    k = 0
     while(root.children):
-        node = root.children[0]
-        nodes_list[node.id] = node.counter
-        root = node
-    p_nodes = list(nodes_list.keys())
-    for item in prefix:                     
-        nodes_list[item] = prefix_sup
-    for i in range(1,len(p_nodes) + 1):
-        apex = list(itertools.combinations(p_nodes, i))
-        after_list = [tuple([x for x in prefix] + list(tup)) for tup in apex]
-        for fpattern in after_list:
-            all_sup = []
-            for item in fpattern:
-                all_sup.append(nodes_list[item])
-            sup = min(all_sup)
-            subsets[fpattern] = sup
-    return len(subsets),subsets
+        root = root.children[0]
+        k += 1
+    return 2**k
 
 
 # In[9]:
@@ -264,6 +384,8 @@ def del_infrequent(conditional_pattern_base,minsup):
     This is an enhancing the conditional Pattern Base before building Tree.
     Because of this conditional patterns are modified such that node with high support appears first just to 
     satisfy the property of FP Tree.
+    Paths which are equal after removing the items are inserted once with their counters added, the tree built
+    from them is the same.
     '''
     result = {}
     for key,values in conditional_pattern_base.items():
@@ -281,7 +403,7 @@ def del_infrequent(conditional_pattern_base,minsup):
         for tkey ,tvalue in item_support.items():
             if(tvalue < minsup):
                 itemslist.remove(tkey)
-        patterns = []
+        patterns = {}   # Equal paths are merged into one (path, sum of counters), in the order they first appear.
         for qtuple in values:
             item_list = list(qtuple[0])
             counter = qtuple[1]
@@ -289,58 +411,265 @@ def del_infrequent(conditional_pattern_base,minsup):
             for k in itemslist:
                 if k in item_list:
                     new_list.append(k)
-            patterns.append((tuple(new_list),counter))
-        result[key] = patterns
+            new_list = tuple(new_list)
+            patterns[new_list] = patterns.get(new_list,0) + counter
+        result[key] = list(patterns.items())
     return result
 
 
+def infrequent_item_cut_off(paths,mis):
+    '''
+    Early cut-off for an item of the top FP Tree whose support is below its own MIS mis.
+    No pattern starting with the item can reach mis, so its conditional FP Tree is not built. FP_growth still counts
+    (and emits) the item itself when that tree is not a single path, and nothing when it is. Both follow from paths,
+    the conditional pattern base of the item after del_infrequent, so the result stays the same.
+    Output: (count, no_of_nodes) FP_growth gives for the conditional FP Tree of paths, or None if the tree has an
+            item with support at least mis and has to be mined.
+    '''
+    item_support = {}
+    longest = ()
+    single_path = True
+    for itemset,counter in paths:
+        for item in itemset:
+            item_support[item] = item_support.get(item,0) + counter
+        if(len(itemset) > len(longest)):
+            itemset,longest = longest,itemset
+        if(single_path and tuple(itemset) != tuple(longest[:len(itemset)])):
+            single_path = False
+    if single_path:
+        return 0,len(longest) + 1
+    if(max(item_support.values()) < mis):
+        return 1,len(item_support)      # Every item of the tree is cut off below.
+    return None
+
+
 # In[60]:
 
 
-def FP_growth(fp_tree,prefix,prefix_sup,output_file,MIS,lms):
+def FP_growth(fp_tree,prefix,prefix_sup,output_file,MIS,lms,projection=False):
     '''
     Final FP Growth Alogrithm.
     Generates Patterns if Tree is a single prefix path.
     If tree is not a single prefix path then conditional pattern base is generated and key is added to the 
     Prefix. Again FP tree is build on the conditional Pattern Base. A recursive step.
+    output_file - A pattern sink (count_sink, text_sink, binary_sink of FP_growth) which gets every pattern, or None.
+    projection - Build every conditional FP Tree directly from the node links (FP_tree.project) instead of
+                 making the conditional pattern base. Same results.
+    Conditional FP Trees which cannot give a valid pattern are never built (CFP-growth++ style):
+    below the top every item of a conditional FP Tree has support at least the MIS of prefix[0], so an item with
+    less support always gets an empty tree and is only counted as one node. An item of the top tree below its
+    own MIS goes through infrequent_item_cut_off.
     '''
     count = 0;
     no_of_nodes = 0;
-    frequent_patterns = []
     if(check_for_single_prefix_path(fp_tree.root)):
         if(prefix_sup >= MIS[prefix[0]]):
-            count,frequent_patterns = generate_patterns(fp_tree.root,prefix,prefix_sup)
-        if frequent_patterns:
-            pass
-#             print(frequent_patterns)
+            count = count_patterns(fp_tree.root,prefix,prefix_sup)
+            if output_file is not None:
+                output_patterns(output_file,generate_patterns(fp_tree.root,prefix,prefix_sup),prefix,count)
         return count,fp_tree.nodeCount
     else:
         if prefix:
             minsupport = MIS[prefix[0]]
             count += 1
 #             print({tuple(prefix):prefix_sup})      # Very Important do not delete. Print an important pattern
+            if output_file is not None:
+                output_file.emit(tuple(prefix),prefix_sup)
         else:
             minsupport = lms
 
-        conditional_pattern_base = fp_tree.find_coditional_pattern_base();
-        conditional_pattern_base = del_infrequent(conditional_pattern_base,minsupport)  # Very important step to enhance the code.
+        items = list(fp_tree.header_table)
+        if prefix:
+            items = [key for key in items if fp_tree.header_table[key][0] >= minsupport]
+            no_of_nodes += len(fp_tree.header_table) - len(items)      # Cut off, empty trees.
+        if projection:
+            conditional_pattern_base = dict.fromkeys(items)
+        else:
+            conditional_pattern_base = fp_tree.find_coditional_pattern_base(items);
+            conditional_pattern_base = del_infrequent(conditional_pattern_base,minsupport)  # Very important step to enhance the code.
         for key,values in conditional_pattern_base.items():
             prefix_sup = fp_tree.header_table[key][0]
+            if(not prefix and prefix_sup < MIS[key]):
+                if projection:
+                    values = fp_tree.find_coditional_pattern_base([key])
+                    values = del_infrequent(values,minsupport)[key]
+                result = infrequent_item_cut_off(values,MIS[key])
+                if result is not None:
+                    if(result[0] and output_file is not None):
+                        output_file.emit((key,),prefix_sup)
+                    count += result[0]
+                    no_of_nodes += result[1]
+                    continue
             header_table_child = {}
-            new_fp_tree = FP_tree()
-            for qtuple in values:
-                itemset = qtuple[0]
-                counter = qtuple[1]
-                new_fp_tree.insert(itemset,counter)
+            if projection:
+                new_fp_tree = fp_tree.project(key,minsupport)
+            else:
+                new_fp_tree = fp_tree.conditional_tree()
+                for qtuple in values:
+                    itemset = qtuple[0]
+                    counter = qtuple[1]
+                    new_fp_tree.insert(itemset,counter)
             prefix.append(key)
             pre = prefix.copy()
             prefix.remove(key)
-            a,b = FP_growth(new_fp_tree,pre,prefix_sup,output_file,MIS,lms)
+            a,b = FP_growth(new_fp_tree,pre,prefix_sup,output_file,MIS,lms,projection)
             count += a
             no_of_nodes += b
             
     return count,no_of_nodes
-    
+
+
+def iterative_FP_growth(fp_tree,output_file,MIS,lms,projection=False,order='depth'):
+    '''
+    Non recursive FP_growth(fp_tree,[],0,output_file,MIS,lms,projection), gives the same (count, no_of_nodes).
+    Same work stack as iterative_FP_growth of FP_growth, every frame also keeps the min support of its prefix.
+    order - 'depth' (same order of patterns as FP_growth) or 'memory' (biggest item of every frame first).
+    '''
+    if(order not in ('depth','memory')):
+        raise ValueError("Unknown order: " + str(order))
+    count = 0
+    no_of_nodes = 0
+    stack = []
+    tree,prefix,prefix_sup = fp_tree,[],0
+    while True:
+        if(check_for_single_prefix_path(tree.root)):
+            if(prefix_sup >= MIS[prefix[0]]):
+                a = count_patterns(tree.root,prefix,prefix_sup)
+                if output_file is not None:
+                    output_patterns(output_file,generate_patterns(tree.root,prefix,prefix_sup),prefix,a)
+                count += a
+            no_of_nodes += tree.nodeCount
+        else:
+            if prefix:
+                minsupport = MIS[prefix[0]]
+                count += 1
+                if output_file is not None:
+                    output_file.emit(tuple(prefix),prefix_sup)
+            else:
+                minsupport = lms
+            supports = {}
+            for key,values in tree.header_table.items():
+                supports[key] = values[0]
+            keys = list(supports)
+            if prefix:
+                keys = [key for key in keys if supports[key] >= minsupport]
+                no_of_nodes += len(supports) - len(keys)        # Cut off, see FP_growth.
+            if projection:
+                source = tree
+                size = supports
+            else:
+                source = del_infrequent(tree.find_coditional_pattern_base(keys),minsupport)
+                size = {key:sum(len(qtuple[0]) for qtuple in values) for key,values in source.items()}
+            if(order == 'memory'):
+                keys.sort(key=size.get,reverse=True)
+            keys.reverse()      # Taken from the end.
+            if keys:
+                stack.append((source,prefix,keys,supports,minsupport,tree.conditional_tree()))
+        tree = None
+        while(tree is None and stack):
+            source,parent_prefix,keys,supports,minsupport,empty_tree = stack[-1]
+            key = keys.pop()
+            if not keys:
+                stack.pop()         # Last item, the frame is freed before its subtree is mined.
+            if(not parent_prefix and supports[key] < MIS[key]):
+                if projection:
+                    values = del_infrequent(source.find_coditional_pattern_base([key]),minsupport)[key]
+                else:
+                    values = source[key]
+                result = infrequent_item_cut_off(values,MIS[key])
+                if result is not None:
+                    if(result[0] and output_file is not None):
+                        output_file.emit((key,),supports[key])
+                    count += result[0]
+                    no_of_nodes += result[1]
+                    if not projection:
+                        del source[key]
+                    continue
+            if projection:
+                tree = source.project(key,minsupport)
+            else:
+                tree = empty_tree.conditional_tree()
+                for qtuple in source.pop(key):
+                    tree.insert(qtuple[0],qtuple[1])
+            source = None
+            prefix = parent_prefix + [key]
+            prefix_sup = supports[key]
+        if tree is None:
+            break
+    return count,no_of_nodes
+
+
+worker_MIS = {}     # MIS of the data set in a worker process of parallel_FP_growth, set once by init_worker.
+
+
+def init_worker(MIS):
+    '''
+    Initializer of the worker processes of parallel_FP_growth. MIS is sent once per process instead of once per task.
+    '''
+    global worker_MIS
+    worker_MIS = MIS
+
+
+def mine_conditional_pattern_base(key,values,prefix_sup,new_fp_tree,lms,sink_class=None,part_path=None,
+                                  projection=False):
+    '''
+    Worker of parallel_FP_growth, runs in a worker process.
+    Builds the conditional FP Tree of one item from its conditional pattern base (already passed through
+    del_infrequent) into the empty tree new_fp_tree and mines it with FP_growth.
+    If sink_class is given the patterns are written to part_path by a sink of that class.
+    Output: (count, no_of_nodes) of FP_growth.
+    '''
+    for qtuple in values:
+        new_fp_tree.insert(qtuple[0],qtuple[1])
+    output_file = sink_class(part_path) if sink_class else None
+    result = FP_growth(new_fp_tree,[key],prefix_sup,output_file,worker_MIS,lms,projection)
+    if output_file is not None:
+        output_file.close()
+    return result
+
+
+def parallel_FP_growth(fp_tree,output_file,MIS,lms,workers=None,projection=False):
+    '''
+    Parallel version of FP_growth(fp_tree,[],0,output_file,MIS,lms), gives the same (count, no_of_nodes).
+    The conditional pattern base of every item in the header table is mined independently in a process pool.
+    Items are submitted biggest conditional pattern base first so that the long tasks do not end up last.
+    Every worker writes its patterns to its own temporary file which is merged into output_file when it is done.
+    workers - No of processes, defaults to the no of CPUs.
+    projection - Passed to FP_growth in the workers.
+    '''
+    if(check_for_single_prefix_path(fp_tree.root)):
+        return FP_growth(fp_tree,[],0,output_file,MIS,lms,projection)
+    conditional_pattern_base = fp_tree.find_coditional_pattern_base()
+    conditional_pattern_base = del_infrequent(conditional_pattern_base,lms)
+    tasks = sorted(conditional_pattern_base.items(),key=lambda kv: sum(len(qtuple[0]) for qtuple in kv[1]),reverse=True)
+    sink_class = type(output_file) if output_file is not None else None
+    part_dir,paths = part_paths(output_file,len(tasks))
+    count = 0
+    no_of_nodes = 0
+    with ProcessPoolExecutor(max_workers=workers,initializer=init_worker,initargs=(MIS,)) as executor:
+        futures = {}
+        for (key,values),path in zip(tasks,paths):
+            prefix_sup = fp_tree.header_table[key][0]
+            if(prefix_sup < MIS[key]):
+                result = infrequent_item_cut_off(values,MIS[key])
+                if result is not None:
+                    if(result[0] and output_file is not None):
+                        output_file.emit((key,),prefix_sup)
+                    count += result[0]
+                    no_of_nodes += result[1]
+                    continue
+            future = executor.submit(mine_conditional_pattern_base,key,values,prefix_sup,
+                                     fp_tree.conditional_tree(),lms,sink_class,path,projection)
+            futures[future] = path
+        for future in as_completed(futures):
+            a,b = future.result()
+            count += a
+            no_of_nodes += b
+            if output_file is not None:
+                output_file.merge(futures[future],a)
+    if part_dir:
+        shutil.rmtree(part_dir)
+    return count,no_of_nodes
 
 
 # In[61]:
@@ -358,9 +687,9 @@ def get_MIS(item_support,beta,minSup):
 
 
 class MIS_tree:
-    def __init__(self,MIS):
+    def __init__(self,MIS,indexed=False):
         self.MIS_list = sort_items_and_add_support_column(MIS)    #Sorting MIS and obtaining a array in which row represent [item name, MIS, support]
-        self.prefix_tree = FP_tree()
+        self.prefix_tree = FP_tree(indexed)
     def createTree(self,data):
         for transaction in data:
             itemset = []
@@ -373,6 +702,38 @@ class MIS_tree:
             self.prefix_tree.insert(itemset,1)
 #         print(self.prefix_tree.header_table)
 #         self.prefix_tree.root.disp("")
+
+    def createTreeBatched(self,data,batch_size=10000):
+        '''
+        Builds the same prefix tree and support column as createTree without changing data.
+        Every item gets its rank in MIS_list once and the items of a transaction are sorted by rank once, instead
+        of searching the transaction for every item of MIS_list. Supports are added to the support column at the
+        end. Equal itemsets of a batch (up to batch_size different itemsets) are inserted once with their count,
+        in the order of their first transaction, so nodes and node links are made in the same order.
+        '''
+        rank = {}
+        for i in range(len(self.MIS_list)):
+            rank[self.MIS_list[i][0]] = i
+        names = [row[0] for row in self.MIS_list]
+        support = [0]*len(self.MIS_list)
+        batch = {}
+        for transaction in data:
+            ranks = sorted({rank[item] for item in transaction if item in rank})
+            for i in ranks:
+                support[i] += 1
+            itemset = tuple([names[i] for i in ranks])
+            batch[itemset] = batch.get(itemset,0) + 1
+            if(len(batch) >= batch_size):
+                self.insertBatch(batch)
+                batch = {}
+        self.insertBatch(batch)
+        for i in range(len(support)):
+            self.MIS_list[i][1] += support[i]
+
+    def insertBatch(self,batch):
+        for itemset,counter in batch.items():
+            if itemset:
+                self.prefix_tree.insert(itemset,counter)
         
     def misPruning(self,item):
         node = self.prefix_tree.header_table[item][1]
@@ -394,7 +755,37 @@ class MIS_tree:
                     if(flag == 0):
                         parent.children.append(x)
             node = node.nextLink
-        
+
+    def pruneItems(self,items):
+        '''
+        Batched misPruning. items is the list of items in the order misPruning would be called for them.
+        Every node is handled like in misPruning and the tree is the same, but a parent which gets moved children
+        gets a dictionary of its children by item once, so merging a moved child is a lookup instead of a scan of
+        the children of the parent for every moved child of every pruned node.
+        '''
+        indexes = {}    # id of parent -> {item: child}, made the first time children are moved to the parent.
+        for item in items:
+            values = self.prefix_tree.header_table.pop(item,None)
+            node = values[1] if values else None
+            while(node):
+                parent = node.parent
+                parent.children.remove(node)
+                index = indexes.get(id(parent))
+                if index is not None:
+                    del index[item]
+                if node.children:
+                    if index is None:
+                        index = {child.id:child for child in parent.children}
+                        indexes[id(parent)] = index
+                    for x in node.children:     # ******************Enhanced Version *******************
+                        y = index.get(x.id)
+                        if y is not None:
+                            y.inc(x.counter)
+                        else:
+                            parent.children.append(x)
+                            index[x.id] = x
+                node = node.nextLink
+
     def inFrequentLeafNodePruning(self):
         length = len(self.MIS_list)
         for index in range(length - 2,-1,-1):
@@ -423,9 +814,16 @@ class MIS_tree:
 # In[63]:
 
 
-def createCompactMISTree(data,MIS):
-    mis_tree= MIS_tree(MIS)
-    mis_tree.createTree(data)
+def createCompactMISTree(data,MIS,indexed=False,batched=False):
+    '''
+    batched - Build with MIS_tree.createTreeBatched and prune all the items at once with MIS_tree.pruneItems.
+    '''
+    mis_tree= MIS_tree(MIS,indexed)
+    if batched:
+        mis_tree.createTreeBatched(data)
+        return pruneCompactMISTree(mis_tree)
+    else:
+        mis_tree.createTree(data)
     length = len(mis_tree.MIS_list)
     header_table = mis_tree.MIS_list
     for index in range(length - 1,-1,-1):
@@ -446,35 +844,228 @@ def createCompactMISTree(data,MIS):
     return mis_tree,LMS
 
 
+def pruneCompactMISTree(mis_tree):
+    '''
+    Same pruning as createCompactMISTree, the items are chosen the same way and pruned with one pruneItems call.
+    '''
+    items = []
+    length = len(mis_tree.MIS_list)
+    for index in range(length - 1,-1,-1):
+        if(mis_tree.MIS_list[index][1] < mis_tree.MIS_list[index][2]):    # Support less than MIS
+            items.append(mis_tree.MIS_list[index][0])
+            del mis_tree.MIS_list[index]
+        else:
+            LMS = mis_tree.MIS_list[index][2]
+            break
+    length = len(mis_tree.MIS_list)
+    for index in range(length - 1, -1 ,-1):
+        if(mis_tree.MIS_list[index][1] < LMS):    # Support less than Least minimum support
+            items.append(mis_tree.MIS_list[index][0])
+            del mis_tree.MIS_list[index]
+    mis_tree.pruneItems(items)
+    mis_tree.inFrequentLeafNodePruning()
+    return mis_tree,LMS
 
-def main(pathToDataSet,beta,minSup):
+
+def read_sweep_data(pathToDataSet,least_minSup,data_format='text'):
     '''
-    Inputs: pathToDataSet - Absolute path to the data set.
-            MIS - A dictionary of minimum support value for every item.
+    Reads the data set once for sweep.
+    Equal rows are kept once with their count, the item supports are counted from them like
+    find_support_for_every_item. Every basket is then ordered by support, the items with support below
+    least_minSup (percentage) are left out because no configuration of the sweep keeps them.
+    Output: (Dictionary of sorted item support, Dictionary of basket tuple -> count in the order of first
+             transaction, no of transactions)
     '''
-    data = []   # Carries list of data and transactions.
-    header_table = {}  # Header Table keeps track of all the nodes of same type.
+    rows = {}
     total_trans = 0
-    with open(pathToDataSet,'r') as csvfile:
-        plots = csv.reader(csvfile, delimiter=' ')
-        for row in plots:
-            data.append(row)
-            total_trans += 1
-    print("No of Transactions:",total_trans)
-    minSup = (minSup*total_trans/100)
-    item_support = find_support_for_every_item(data)
+    for row in read_transactions(pathToDataSet,data_format):
+        row = tuple(row)
+        rows[row] = rows.get(row,0) + 1
+        total_trans += 1
+    item_support = {}
+    for row,counter in rows.items():
+        for item in row:
+            if(item == ''):      # Data Cleaning eliminate empty space.
+                continue
+            item_support[item] = item_support.get(item,0) + counter
     item_support = sort_items_on_Value(item_support)
-    MIS = get_MIS(item_support,beta,minSup)
-#     print(MIS)
-    tree,lms = createCompactMISTree(data,MIS)
-    print("No of Frequent Items:",len(tree.prefix_tree.header_table))
-    total_patterns,nodeCount = FP_growth(tree.prefix_tree,[],0,'',MIS,lms)
+    least_minSup = least_minSup*total_trans/100
+    rank = {}
+    for item,value in item_support.items():
+        if(value >= least_minSup):
+            rank[item] = len(rank)
+    names = list(rank)
+    baskets = {}
+    for row,counter in rows.items():
+        itemset = tuple([names[i] for i in sorted({rank[item] for item in row if item in rank})])
+        baskets[itemset] = baskets.get(itemset,0) + counter
+    return item_support,baskets,total_trans
+
+
+sweep_tree = None       # Unpruned MIS tree of sweep in this process, set by init_sweep_worker.
+sweep_item_support = {}
+
+
+def init_sweep_worker(baskets,item_support,indexed=False):
+    '''
+    Builds the tree of sweep once per process from the baskets of read_sweep_data.
+    With get_MIS the MIS of an item never goes down when its support goes up, so MIS_list is in the order of
+    support for every beta and minSup and the MIS tree before pruning is the same for all of them.
+    '''
+    global sweep_tree,sweep_item_support
+    mis_tree = MIS_tree(item_support,indexed)
+    mis_tree.insertBatch(baskets)
+    sweep_tree = mis_tree.prefix_tree
+    sweep_item_support = item_support
+
+
+def mine_sweep_config(beta,minSup,total_trans,projection=False):
+    '''
+    Worker of sweep. Prunes a copy of sweep_tree for (beta, minSup) with pruneCompactMISTree, which gives the tree
+    of createCompactMISTree, and mines it.
+    Output: (beta, minSup, no of frequent items, no of patterns, no of nodes, seconds of pruning, seconds of mining)
+    '''
+    start = time.perf_counter()
+    MIS = get_MIS(sweep_item_support,beta,minSup*total_trans/100)
+    mis_tree = MIS_tree(MIS)
+    mis_tree.prefix_tree = sweep_tree.copy()
+    support = {}
+    for item,values in mis_tree.prefix_tree.header_table.items():
+        support[item] = values[0]
+    for row in mis_tree.MIS_list:
+        row[1] = support.get(row[0],0)
+    mis_tree,lms = pruneCompactMISTree(mis_tree)
+    prune_time = time.perf_counter() - start
+    start = time.perf_counter()
+    total_patterns,nodeCount = FP_growth(mis_tree.prefix_tree,[],0,None,MIS,lms,projection)
+    return (beta,minSup,len(mis_tree.prefix_tree.header_table),total_patterns,nodeCount,prune_time,
+            time.perf_counter() - start)
+
+
+def sweep(pathToDataSet,betas,minSups,workers=1,indexed=False,projection=False,file=sys.stdout,data_format='text'):
+    '''
+    Parameter sweep of main over every (beta, minSup) of betas x minSups (minSup in percentage) with one read of
+    the data set and one build of the MIS tree per process. The tree is built with the items every configuration
+    can keep, every configuration prunes a copy of it (mine_sweep_config) and gives the same counts as main.
+    workers - No of processes, the configurations are spread over them. Every process builds the tree once.
+    data_format - See FP_growth.read_transactions.
+    Writes one table of items, pattern counts, node counts and timings per configuration to file. A configuration
+    which raises does not stop the sweep, its row is (beta, minSup, exception) and the error is written in the table.
+    Output: List of the rows of mine_sweep_config, in the order of the configurations.
+    '''
+    configs = [(beta,minSup) for beta in betas for minSup in minSups]
+    start = time.perf_counter()
+    item_support,baskets,total_trans = read_sweep_data(pathToDataSet,min(minSups),data_format)
+    read_time = time.perf_counter() - start
+    print("No of Transactions:",total_trans,"No of Baskets:",len(baskets),"Read: %.4f s" % read_time,file=file)
+    if(workers > 1):
+        with ProcessPoolExecutor(max_workers=workers,initializer=init_sweep_worker,
+                                 initargs=(baskets,item_support,indexed)) as executor:
+            futures = [executor.submit(mine_sweep_config,beta,minSup,total_trans,projection)
+                       for beta,minSup in configs]
+            rows = []
+            for (beta,minSup),future in zip(configs,futures):
+                try:
+                    rows.append(future.result())
+                except Exception as error:
+                    rows.append((beta,minSup,error))
+    else:
+        start = time.perf_counter()
+        init_sweep_worker(baskets,item_support,indexed)
+        print("Tree: %.4f s" % (time.perf_counter() - start),file=file)
+        rows = []
+        for beta,minSup in configs:
+            try:
+                rows.append(mine_sweep_config(beta,minSup,total_trans,projection))
+            except Exception as error:
+                rows.append((beta,minSup,error))
+    print("%8s %8s %8s %12s %12s %10s %10s" % ("beta","minSup","items","patterns","nodes","prune s","mine s"),
+          file=file)
+    for row in rows:
+        if(len(row) == 3):
+            print("%8g %8g  error: %s: %s" % (row[0],row[1],type(row[2]).__name__,row[2]),file=file)
+        else:
+            print("%8g %8g %8d %12d %12d %10.4f %10.4f" % row,file=file)
+    return rows
+
+
+
+def main(pathToDataSet,beta,minSup,array_tree=False,indexed=False,streaming=False,workers=1,output_format='count',
+         output_path='output.txt',projection=False,snapshot=None,iterative=False,batched=True,data_format='text'):
+    '''
+    Inputs: pathToDataSet - Absolute path to the data set.
+            MIS - A dictionary of minimum support value for every item.
+            array_tree - Mine on an FP_array_tree copy of the compact MIS tree instead of treeNode objects.
+            indexed - Build the MIS tree in indexed mode (see FP_tree).
+            streaming - Read the data set twice (support counting, then tree building) instead of loading it.
+                        Only the tree is kept in memory.
+            workers - No of processes used for mining. More than 1 uses parallel_FP_growth.
+            output_format - 'count' only counts the patterns, 'text' and 'binary' write them to output_path
+                            (see text_sink and binary_sink of FP_growth).
+            projection - Build the conditional FP Trees directly from the node links (see FP_growth).
+            snapshot - Path of a tree snapshot (see FP_growth.save_snapshot). The compact MIS tree is saved with
+                       MIS and lms, and loaded instead of reading the data set when beta and minSup are the same
+                       and the data set file did not change (see FP_growth.dataset_stamp).
+            iterative - Mine with iterative_FP_growth (no recursion) instead of FP_growth.
+            batched - Build the MIS tree with MIS_tree.createTreeBatched and pruneItems, same tree. Equal
+                      baskets are inserted once with their count.
+            data_format - 'text', 'fimi' or 'spmf', see FP_growth.read_transactions. Plain, .gz and .zst files
+                          are read.
+    '''
+    prefix_tree = None
+    if(snapshot is not None and os.path.exists(snapshot)):
+        prefix_tree,meta = load_snapshot(snapshot)
+        if(meta.get('dataset') != pathToDataSet or meta.get('beta') != beta or meta.get('minSup') != minSup or
+           meta.get('stamp') != dataset_stamp(pathToDataSet)):
+            prefix_tree = None
+        else:
+            MIS = meta['MIS']
+            lms = meta['lms']
+            print("No of Transactions:",meta['total_trans'])
+            print("No of Frequent Items:",len(prefix_tree.header_table))
+    if prefix_tree is None:
+        meta = {'dataset':pathToDataSet,'beta':beta,'minSup':minSup,'stamp':dataset_stamp(pathToDataSet)}
+        data = []   # Carries list of data and transactions.
+        total_trans = 0
+        if streaming:
+            item_support,total_trans = find_support_streaming(pathToDataSet,data_format)
+        else:
+            for row in read_transactions(pathToDataSet,data_format):
+                data.append(row)
+                total_trans += 1
+        print("No of Transactions:",total_trans)
+        minSup = (minSup*total_trans/100)
+        if not streaming:
+            item_support = find_support_for_every_item(data)
+        item_support = sort_items_on_Value(item_support)
+        MIS = get_MIS(item_support,beta,minSup)
+#         print(MIS)
+        if streaming:
+            data = read_transactions(pathToDataSet,data_format)     # createTree consumes the file row by row.
+        tree,lms = createCompactMISTree(data,MIS,indexed,batched)
+        print("No of Frequent Items:",len(tree.prefix_tree.header_table))
+        prefix_tree = FP_array_tree.from_tree(tree.prefix_tree) if array_tree else tree.prefix_tree
+        if snapshot is not None:
+            meta.update({'MIS':MIS,'lms':lms,'total_trans':total_trans})
+            save_snapshot(prefix_tree,snapshot,meta)
+    file = open_sink(output_format,output_path)
+    if(workers > 1):
+        total_patterns,nodeCount = parallel_FP_growth(prefix_tree,file,MIS,lms,workers,projection)
+    elif iterative:
+        total_patterns,nodeCount = iterative_FP_growth(prefix_tree,file,MIS,lms,projection)
+    else:
+        total_patterns,nodeCount = FP_growth(prefix_tree,[],0,file,MIS,lms,projection)
     print("No of Frequent Patterns:",total_patterns)
     print("No of Nodes:",nodeCount)
+    file.close()
 
 
 
 if(__name__ == "__main__"):
-    path = '/home/satya/Research/uday/'
-    path += str(sys.argv[1])
-    main(path,float(sys.argv[2]),float(sys.argv[3]))     #support in percentage
+    if(sys.argv[1] == 'sweep'):     # sweep data_set beta,beta,... minSup,minSup,... [workers]
+        betas = [float(beta) for beta in sys.argv[3].split(',')]
+        minSups = [float(minSup) for minSup in sys.argv[4].split(',')]
+        sweep(sys.argv[2],betas,minSups,int(sys.argv[5]) if len(sys.argv) > 5 else 1)
+    else:
+        data_format = sys.argv[4] if len(sys.argv) > 4 else 'text'
+        main(sys.argv[1],float(sys.argv[2]),float(sys.argv[3]),data_format=data_format)     #support in percentage
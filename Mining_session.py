@@ -0,0 +1,252 @@
+'''
+Mining session which answers frequent pattern queries at many minimum supports from one FP_growth run.
+The data set is mined once at the lowest minSup asked for (the floor) and the patterns are kept in a store on disk,
+sorted by support with an index of where every support ends. A query at minSup >= floor only reads the front of
+the store. Only a query below the floor mines again. Stores of all data sets share a cache directory which is kept
+under max_bytes by removing the least recently used stores.
+'''
+import hashlib
+import heapq
+import json
+import os
+import struct
+import sys
+import time
+
+from FP_growth import build_fp_tree, FP_growth, parallel_FP_growth, binary_sink, read_binary_patterns
+
+
+MERGE_WIDTH = 64    # Most runs merged at once by mining_session.mine.
+
+
+def write_run(run,path):
+    '''
+    Sorts a run of (support, store record) by support, highest first, and writes its records to path.
+    The sort is stable so records of the same support keep the order they were mined in.
+    Output: path.
+    '''
+    run.sort(key=lambda record: record[0],reverse=True)
+    with open(path,'wb') as file:
+        for support,record in run:
+            file.write(record)
+    return path
+
+
+def merge_runs(paths):
+    '''
+    Merges sorted runs into one iterator of (support, store record), highest support first. Records of the same
+    support come in the order of paths, so merging runs in the order they were written keeps the mined order.
+    '''
+    return heapq.merge(*[read_run(path) for path in paths],key=lambda record: -record[0])
+
+
+def read_run(path,end=None):
+    '''
+    Reads a run written by write_run, or a store, record by record through a buffered file so only one record
+    is in memory at a time. end - Stop at this offset, default the end of the file.
+    Output: Yields every record as (support, store record).
+    '''
+    offset = 0
+    with open(path,'rb') as file:
+        while(end is None or offset < end):
+            head = file.read(2)
+            if not head:
+                break
+            body = file.read(4*struct.unpack('<H',head)[0] + 8)
+            offset += len(head) + len(body)
+            yield struct.unpack_from('<q',body,len(body) - 8)[0],head + body
+
+
+class mining_session:
+    def __init__(self,pathToDataSet,cache_dir='fp_cache',max_bytes=1<<30,workers=1,run_bytes=64<<20):
+        '''
+        pathToDataSet - Path to the data set. The store is made again when the file changes (size or time).
+        cache_dir - Directory of the stores and of their index, index.json.
+        max_bytes - Total size of the stores in cache_dir, least recently used ones are removed above it.
+        workers - No of processes used for mining, see parallel_FP_growth.
+        run_bytes - Bytes of store records sorted in memory at once while a store is written, see mine.
+        '''
+        self.pathToDataSet = pathToDataSet
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.run_bytes = run_bytes
+        stat = os.stat(pathToDataSet)
+        name = '%s:%d:%d' % (os.path.abspath(pathToDataSet),stat.st_size,stat.st_mtime_ns)
+        self.key = hashlib.sha1(name.encode('utf-8')).hexdigest()
+        os.makedirs(cache_dir,exist_ok=True)
+
+    def read_index(self):
+        path = os.path.join(self.cache_dir,'index.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path,'r') as file:
+            return json.load(file)
+
+    def write_index(self,index):
+        path = os.path.join(self.cache_dir,'index.json')
+        with open(path + '.tmp','w') as file:
+            json.dump(index,file)
+        os.replace(path + '.tmp',path)
+
+    def store_path(self,key):
+        return os.path.join(self.cache_dir,key + '.patterns')
+
+    def prepare(self,thresholds):
+        '''
+        Makes sure all the minSup values in thresholds (percentages) can be answered from the store by mining
+        once at the lowest of them if it is below the floor. Output: The store entry of the data set.
+        '''
+        minSup = min(thresholds)
+        index = self.read_index()
+        entry = index.get(self.key)
+        if(entry is None or minSup < entry['floor']):
+            entry = self.mine(minSup)
+            index[self.key] = entry
+        entry['used'] = time.time()
+        self.evict(index)
+        self.write_index(index)
+        return entry
+
+    def mine(self,minSup):
+        '''
+        Mines the data set at minSup with FP_growth and writes the store, records sorted by support:
+            no of items (uint16), item ids (uint32 each), support (int64)
+        The entry keeps the item names and levels, a list of [support, end of its records, no of records up to
+        there] from the highest support down, so the patterns with support >= s are the bytes before the end of
+        the last level >= s.
+        The patterns are sorted by an external merge sort: runs of about run_bytes of records are sorted and
+        written next to the store, then merged while the store is written. Only one run and the item names are
+        in memory at a time, not every pattern.
+        '''
+        fp_tree,minsup,sorted_frequent_items,total_trans = build_fp_tree(self.pathToDataSet,minSup,streaming=True)
+        part_path = self.store_path(self.key) + '.part'
+        sink = binary_sink(part_path)
+        if(self.workers > 1):
+            parallel_FP_growth(fp_tree,sink,minsup,self.workers)
+        else:
+            FP_growth(fp_tree,[],0,sink,minsup)
+        sink.close()
+        del fp_tree
+        item_ids = {}
+        run_paths = []
+        run = []
+        size = 0
+        for pattern,support in read_binary_patterns(part_path):
+            ids = []
+            for item in pattern:
+                if item not in item_ids:
+                    item_ids[item] = len(item_ids)
+                ids.append(item_ids[item])
+            record = struct.pack('<H%dIq' % len(ids),len(ids),*ids,support)
+            run.append((support,record))
+            size += len(record)
+            if(size >= self.run_bytes):
+                run_paths.append(write_run(run,self.run_path(len(run_paths))))
+                run = []
+                size = 0
+        os.remove(part_path)
+        if run_paths:
+            if run:
+                run_paths.append(write_run(run,self.run_path(len(run_paths))))
+                run = []
+            no_of_runs = len(run_paths)
+            while(len(run_paths) > MERGE_WIDTH):     # Merge passes keep the no of open runs under MERGE_WIDTH.
+                merged = []
+                for i in range(0,len(run_paths),MERGE_WIDTH):
+                    path = self.run_path(no_of_runs)
+                    no_of_runs += 1
+                    with open(path,'wb') as file:
+                        for support,record in merge_runs(run_paths[i:i + MERGE_WIDTH]):
+                            file.write(record)
+                    merged.append(path)
+                for path in run_paths:
+                    os.remove(path)
+                run_paths = merged
+            records = merge_runs(run_paths)
+        else:
+            run.sort(key=lambda record: record[0],reverse=True)
+            records = run
+        levels = []
+        offset = 0
+        with open(self.store_path(self.key),'wb') as file:
+            for support,record in records:
+                file.write(record)
+                offset += len(record)
+                if(levels and levels[-1][0] == support):
+                    levels[-1][1] = offset
+                    levels[-1][2] += 1
+                else:
+                    levels.append([support,offset,levels[-1][2] + 1 if levels else 1])
+        for path in run_paths:
+            os.remove(path)
+        return {'dataset':self.pathToDataSet,'floor':minSup,'minsup':minsup,'total_trans':total_trans,
+                'item_names':list(item_ids),'levels':levels,'bytes':offset}
+
+    def run_path(self,number):
+        return self.store_path(self.key) + '.run%d' % number
+
+    def evict(self,index):
+        '''
+        Removes the least recently used stores other than the one of this session until the stores in the index
+        fit in max_bytes.
+        '''
+        total = sum(entry['bytes'] for entry in index.values())
+        for key in sorted(index,key=lambda key: index[key]['used']):
+            if(total <= self.max_bytes):
+                break
+            if(key == self.key):
+                continue
+            total -= index[key]['bytes']
+            if os.path.exists(self.store_path(key)):
+                os.remove(self.store_path(key))
+            del index[key]
+
+    def level(self,minSup):
+        '''
+        Output: (store entry, end of the records, no of patterns) for the patterns with support at least minSup.
+        '''
+        entry = self.prepare([minSup])
+        minsup = minSup*entry['total_trans']/100
+        end = 0
+        count = 0
+        for support,offset,records in entry['levels']:
+            if(support < minsup):
+                break
+            end = offset
+            count = records
+        return entry,end,count
+
+    def patterns(self,minSup):
+        '''
+        Yields every pattern with support at least minSup (percentage) as a tuple of items and its support,
+        highest support first. Mines only if minSup is below the floor.
+        '''
+        entry,end,count = self.level(minSup)
+        item_names = entry['item_names']
+        for support,record in read_run(self.store_path(self.key),end):
+            ids = struct.unpack_from('<%dI' % ((len(record) - 10)//4),record,2)
+            yield tuple(item_names[item_id] for item_id in ids),support
+
+    def query(self,minSup,output_file=None):
+        '''
+        Gives every pattern with support at least minSup (percentage) to the sink output_file. The count comes
+        from the index, the store is read only when there is a sink.
+        Output: No of patterns.
+        '''
+        if output_file is None:
+            return self.level(minSup)[2]
+        count = 0
+        for pattern,support in self.patterns(minSup):
+            count += 1
+            output_file.emit(pattern,support)
+        return count
+
+
+
+if(__name__ == "__main__"):
+    session = mining_session(sys.argv[1])
+    thresholds = [float(minSup) for minSup in sys.argv[2:]]     # support in percentage
+    session.prepare(thresholds)
+    for minSup in thresholds:
+        print("minSup:",minSup,"No of Frequent Patterns:",session.query(minSup))
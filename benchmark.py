@@ -0,0 +1,269 @@
+'''
+Benchmarks.
+Tree build: Times the tree build step of FP_growth.main and MIS_tree.createTree on a generated data set, once with
+the default build and once with the indexed build mode of FP_tree (and MIS_tree.createTreeBatched).
+Suite: Times tree build, conditional pattern base construction and full mining of FP_growth and MMS_FP_growth on
+fixed IBM Quest style data sets (FIXTURES) and compares wall time, peak RSS, nodeCount and pattern counts with a
+stored baseline. Counts must be the same as the baseline, times are only reported.
+Usage: python benchmark.py [no of transactions] [no of items] [average transaction length]
+       python benchmark.py suite [baseline file] [save]
+'''
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:      # resource is Unix only, peak RSS is not reported without it.
+    resource = None
+
+import FP_growth
+import MMS_FP_growth
+
+
+def generate_transactions(no_of_transactions,no_of_items,avg_length,seed=1):
+    '''
+    Generates a list of transactions. Item popularity is skewed (zipf like) so that the tree has shared prefixes.
+    The same seed always gives the same data set.
+    '''
+    rand = random.Random(seed)
+    items = ['i' + str(i) for i in range(no_of_items)]
+    weights = [1.0/(i + 1) for i in range(no_of_items)]
+    data = []
+    for i in range(no_of_transactions):
+        length = max(1,int(rand.expovariate(1.0/avg_length)))
+        data.append(sorted(set(rand.choices(items,weights,k=length))))     # Sorted, set order changes per run.
+    return data
+
+
+def time_fp_build(data,minSup,indexed):
+    '''
+    Preprocesses the data like FP_growth.main and times only inserting the ordered dataset into the FP Tree.
+    minSup is in percentage. Output: (seconds, nodeCount)
+    '''
+    data = [list(transaction) for transaction in data]      # order_items removes items from the transactions.
+    items_support = FP_growth.find_support_for_every_item(data)
+    frequent_items = FP_growth.remove_less_support_items(items_support,minSup*len(data)/100)
+    sorted_frequent_items = FP_growth.sort_items_on_Value(frequent_items)
+    ordered_dataset = FP_growth.order_items(data,sorted_frequent_items)
+    start = time.perf_counter()
+    fp_tree = FP_growth.FP_tree(indexed)
+    for itemset in ordered_dataset:
+        fp_tree.insert(itemset,1)
+    return time.perf_counter() - start,fp_tree.nodeCount
+
+
+def time_mis_build(data,beta,minSup,indexed,batched=False):
+    '''
+    Computes MIS values like MMS_FP_growth.main and times MIS_tree.createTree (createTreeBatched if batched).
+    minSup is in percentage. Output: (seconds, nodeCount)
+    '''
+    data = [list(transaction) for transaction in data]      # createTree removes items from the transactions.
+    item_support = MMS_FP_growth.sort_items_on_Value(MMS_FP_growth.find_support_for_every_item(data))
+    MIS = MMS_FP_growth.get_MIS(item_support,beta,minSup*len(data)/100)
+    start = time.perf_counter()
+    mis_tree = MMS_FP_growth.MIS_tree(MIS,indexed)
+    if batched:
+        mis_tree.createTreeBatched(data)
+    else:
+        mis_tree.createTree(data)
+    return time.perf_counter() - start,mis_tree.prefix_tree.nodeCount
+
+
+def poisson(rand,mean):
+    '''
+    Poisson distributed random number (Knuth), used for the lengths of the Quest generator.
+    '''
+    limit = 2.718281828459045**-mean
+    k = 0
+    p = rand.random()
+    while(p > limit):
+        k += 1
+        p *= rand.random()
+    return k
+
+
+def quest_transactions(no_of_transactions,avg_length,no_of_items,density=0.5,no_of_patterns=None,
+                       avg_pattern_length=4,seed=1):
+    '''
+    IBM Quest style generator (Agrawal and Srikant). A pool of no_of_patterns potentially frequent itemsets is made
+    first (Poisson lengths, mean avg_pattern_length). Every itemset takes about half its items from the previous
+    one, gets an exponentially distributed weight and a corruption level. A transaction (Poisson length, mean
+    avg_length) takes itemsets from the pool by weight and every itemset loses each item with its corruption level.
+    density - Fraction of the items of a transaction taken from the pool, the rest are uniform random items.
+              Higher density and fewer items give long shared prefixes, the dense regime.
+    The same arguments always give the same data set.
+    '''
+    rand = random.Random(seed)
+    if no_of_patterns is None:
+        no_of_patterns = max(1,no_of_items//4)
+    items = ['i' + str(i) for i in range(no_of_items)]
+    patterns = []
+    for i in range(no_of_patterns):
+        length = min(max(1,poisson(rand,avg_pattern_length)),no_of_items)
+        pattern = []
+        if patterns:
+            previous = patterns[-1]
+            pattern = rand.sample(previous,min(len(previous),length,int(rand.expovariate(2.0)*length)))
+        while(len(pattern) < length):
+            item = rand.choice(items)
+            if item not in pattern:
+                pattern.append(item)
+        patterns.append(pattern)
+    cum_weights = list(itertools.accumulate(rand.expovariate(1.0) for pattern in patterns))
+    corruption = [min(max(rand.gauss(0.5,0.1),0.0),1.0) for pattern in patterns]
+    data = []
+    for t in range(no_of_transactions):
+        length = min(max(1,poisson(rand,avg_length)),no_of_items)
+        target = int(round(length*density))
+        transaction = set()
+        tries = 0
+        while(len(transaction) < target and tries < 4*length):
+            tries += 1
+            index = rand.choices(range(no_of_patterns),cum_weights=cum_weights)[0]
+            pattern = [item for item in patterns[index] if rand.random() >= corruption[index]]
+            if(len(transaction) + len(pattern) > length and transaction and rand.random() < 0.5):
+                break       # Does not fit, left for the next transaction half of the time.
+            transaction.update(pattern)
+        while(len(transaction) < length):
+            transaction.add(rand.choice(items))
+        data.append(sorted(transaction))        # Sorted, set order changes per run.
+    return data
+
+
+FIXTURES = {
+    'sparse':{'no_of_transactions':20000,'avg_length':10,'no_of_items':1000,'density':0.5,'minSup':0.2,'beta':0.5},
+    'dense':{'no_of_transactions':3000,'avg_length':20,'no_of_items':60,'density':0.9,'minSup':20,'beta':0.5},
+}
+
+
+def bench_fp_growth(data,minSup):
+    '''
+    Times the phases of FP_growth.main on data, minSup in percentage. Every phase is timed on its own:
+    build (support counting, ordering and inserting), conditional_base (find_coditional_pattern_base and
+    del_infrequent of the whole tree) and mining (FP_growth, counting only).
+    '''
+    result = {}
+    start = time.perf_counter()
+    items_support = FP_growth.find_support_for_every_item(data)
+    minsup = minSup*len(data)/100
+    sorted_frequent_items = FP_growth.sort_items_on_Value(FP_growth.remove_less_support_items(items_support,minsup))
+    fp_tree = FP_growth.FP_tree()
+    for itemset in FP_growth.order_items(data,sorted_frequent_items):
+        fp_tree.insert(itemset,1)
+    result['build'] = time.perf_counter() - start
+    start = time.perf_counter()
+    FP_growth.del_infrequent(fp_tree.find_coditional_pattern_base(),minsup)
+    result['conditional_base'] = time.perf_counter() - start
+    start = time.perf_counter()
+    result['patterns'],result['mined_nodes'] = FP_growth.FP_growth(fp_tree,[],0,None,minsup)
+    result['mining'] = time.perf_counter() - start
+    result['nodeCount'] = fp_tree.nodeCount
+    return result
+
+
+def bench_mms_fp_growth(data,beta,minSup):
+    '''
+    Same phases as bench_fp_growth for MMS_FP_growth.main. build includes computing MIS and the pruning of
+    createCompactMISTree.
+    '''
+    result = {}
+    start = time.perf_counter()
+    item_support = MMS_FP_growth.sort_items_on_Value(MMS_FP_growth.find_support_for_every_item(data))
+    MIS = MMS_FP_growth.get_MIS(item_support,beta,minSup*len(data)/100)
+    tree,lms = MMS_FP_growth.createCompactMISTree(data,MIS)
+    prefix_tree = tree.prefix_tree
+    result['build'] = time.perf_counter() - start
+    start = time.perf_counter()
+    MMS_FP_growth.del_infrequent(prefix_tree.find_coditional_pattern_base(),lms)
+    result['conditional_base'] = time.perf_counter() - start
+    start = time.perf_counter()
+    result['patterns'],result['mined_nodes'] = MMS_FP_growth.FP_growth(prefix_tree,[],0,None,MIS,lms)
+    result['mining'] = time.perf_counter() - start
+    result['nodeCount'] = prefix_tree.nodeCount
+    return result
+
+
+def run_benchmark(fixture,algorithm):
+    '''
+    Runs one algorithm on one fixture. Run in a fresh process so that peak RSS (in KB) belongs to this run only.
+    '''
+    params = FIXTURES[fixture]
+    data = quest_transactions(params['no_of_transactions'],params['avg_length'],params['no_of_items'],
+                              params['density'])
+    if(algorithm == 'FP_growth'):
+        result = bench_fp_growth(data,params['minSup'])
+    else:
+        result = bench_mms_fp_growth(data,params['beta'],params['minSup'])
+    result['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+    return result
+
+
+def suite(baseline_path='benchmark_baseline.json',save=False):
+    '''
+    Runs every algorithm on every fixture and compares with the baseline file. nodeCount, mined_nodes and
+    patterns must be equal to the baseline, times are shown as a change in percent.
+    save - Write the results as the new baseline.
+    Output: True if no count differs from the baseline.
+    '''
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path,'r') as file:
+            baseline = json.load(file)
+    results = {}
+    same = True
+    print("%-8s %-14s %10s %10s %10s %10s %10s %10s" % ("fixture","algorithm","build s","cond s","mining s",
+                                                        "RSS MB","nodeCount","patterns"))
+    for fixture in FIXTURES:
+        for algorithm in ('FP_growth','MMS_FP_growth'):
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_benchmark,fixture,algorithm).result()
+            name = fixture + '/' + algorithm
+            results[name] = result
+            rss = result['peak_rss_kb']/1024 if result['peak_rss_kb'] else float('nan')
+            print("%-8s %-14s %10.3f %10.3f %10.3f %10.1f %10d %10d" % (fixture,algorithm,result['build'],
+                  result['conditional_base'],result['mining'],rss,result['nodeCount'],result['patterns']))
+            if name not in baseline:
+                continue
+            old = baseline[name]
+            changes = []
+            for key in ('build','conditional_base','mining'):
+                changes.append("%+9.1f%%" % (100*(result[key] - old[key])/old[key]) if old[key] else "%10s" % "-")
+            counts = []
+            for key in ('nodeCount','mined_nodes','patterns'):
+                if(result[key] != old[key]):
+                    counts.append("%s %d != baseline %d" % (key,result[key],old[key]))
+            same = same and not counts
+            print("%-23s %s %s" % ("  vs baseline"," ".join(changes),"; ".join(counts) if counts else "counts same"))
+    if save:
+        with open(baseline_path,'w') as file:
+            json.dump(results,file,indent=1,sort_keys=True)
+    return same
+
+
+def main(no_of_transactions,no_of_items,avg_length):
+    data = generate_transactions(no_of_transactions,no_of_items,avg_length)
+    print("No of Transactions:",no_of_transactions)
+    print("No of Items:",no_of_items)
+    for name,build in (("FP_growth.main",lambda indexed:time_fp_build(data,0.01,indexed)),
+                       ("MIS_tree.createTree",lambda indexed:time_mis_build(data,0.5,0.01,indexed))):
+        for indexed in (False,True):
+            seconds,nodeCount = build(indexed)
+            print("%-20s %-8s %10.3f s  %d nodes" % (name,"indexed" if indexed else "default",seconds,nodeCount))
+    seconds,nodeCount = time_mis_build(data,0.5,0.01,True,True)
+    print("%-20s %-8s %10.3f s  %d nodes" % ("MIS_tree.createTree","batched",seconds,nodeCount))
+
+
+if(__name__ == "__main__"):
+    if(len(sys.argv) > 1 and sys.argv[1] == 'suite'):
+        baseline_path = sys.argv[2] if len(sys.argv) > 2 else 'benchmark_baseline.json'
+        same = suite(baseline_path,len(sys.argv) > 3 and sys.argv[3] == 'save')
+        sys.exit(0 if same else 1)
+    no_of_transactions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    no_of_items = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    avg_length = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    main(no_of_transactions,no_of_items,avg_length)
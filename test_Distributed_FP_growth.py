@@ -0,0 +1,62 @@
+'''
+Tests of Distributed_FP_growth with local worker processes. Run with python -m pytest or python -m unittest.
+'''
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import FP_growth
+from Distributed_FP_growth import distributed_FP_growth, start_local_workers, stop_workers, group_items
+from test_FP_growth import write_dataset, random_transactions, read_text_patterns
+
+
+class distributed_test(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.processes,cls.workers = start_local_workers(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        stop_workers(cls.workers)
+        for process in cls.processes:
+            process.join()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_same_as_FP_growth(self):
+        for seed in range(6):
+            path = write_dataset(self.directory,random_transactions(seed,10,60))
+            for minSup in (5,20):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    fp_tree,minsup,sorted_frequent_items,total_trans = FP_growth.build_fp_tree(path,minSup)
+                sink = FP_growth.text_sink(os.path.join(self.directory,'single.txt'))
+                expected = FP_growth.FP_growth(fp_tree,[],0,sink,minsup)
+                sink.close()
+                for no_of_groups in (None,1,3,7):
+                    sink = FP_growth.text_sink(os.path.join(self.directory,'sharded.txt'))
+                    count,no_of_nodes,trans = distributed_FP_growth(path,minSup,self.workers,sink,no_of_groups,
+                                                                    self.directory)
+                    sink.close()
+                    self.assertEqual((count,no_of_nodes),expected,(seed,minSup,no_of_groups))
+                    self.assertEqual(trans,total_trans)
+                    self.assertEqual(read_text_patterns(sink.path),read_text_patterns(os.path.join(self.directory,
+                                                                                                   'single.txt')))
+
+    def test_group_items(self):
+        supports = [9,7,7,5,3,2,1]
+        groups = group_items(supports,3)
+        self.assertEqual(sorted(rank for group in groups for rank in group),list(range(len(supports))))
+        for group in groups:
+            self.assertEqual(group,sorted(group))
+
+
+
+if(__name__ == "__main__"):
+    unittest.main()
@@ -0,0 +1,80 @@
+'''
+Tests of Eclat. Run with python -m pytest or python -m unittest.
+'''
+import contextlib
+import io
+import shutil
+import tempfile
+import unittest
+
+import Eclat
+import FP_growth
+from test_FP_growth import write_dataset, mine
+
+
+class pattern_sink(FP_growth.count_sink):
+    '''
+    Keeps every pattern as frozenset -> support.
+    '''
+    needs_patterns = True
+    def __init__(self):
+        FP_growth.count_sink.__init__(self)
+        self.patterns = {}
+    def emit(self,pattern,support):
+        self.count += 1
+        self.patterns[frozenset(pattern)] = support
+
+
+def eclat_patterns(path,minSup,diffsets):
+    '''
+    Output: (count, patterns) of Eclat.main, the patterns read back from its text output.
+    '''
+    output_path = path + '.out'
+    with contextlib.redirect_stdout(io.StringIO()):
+        count = Eclat.main(path,minSup,diffsets,'text',output_path)
+    patterns = {}
+    with open(output_path) as file:
+        for line in file:
+            items,support = line.split('#SUP:')
+            patterns[frozenset(items.split())] = int(support)
+    return count,patterns
+
+
+def fp_patterns(path,minSup):
+    with contextlib.redirect_stdout(io.StringIO()):
+        fp_tree,minsup,sorted_frequent_items,total_trans = FP_growth.build_fp_tree(path,minSup)
+    sink = pattern_sink()
+    FP_growth.FP_growth(fp_tree,[],0,sink,minsup)
+    return sink.patterns
+
+
+class eclat_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_single_path_counts_one_less(self):
+        # The FP Tree is the single path a - b - c, FP_growth also counts the empty pattern.
+        path = write_dataset(self.directory,[['a','b','c'],['a','b'],['a']])
+        count,no_of_nodes = mine(path,10)
+        for diffsets in (False,True):
+            eclat_count,patterns = eclat_patterns(path,10,diffsets)
+            self.assertEqual(eclat_count,7)
+            self.assertEqual(count,eclat_count + 1)
+            self.assertEqual(patterns,fp_patterns(path,10))
+
+    def test_multi_path_same_count(self):
+        path = write_dataset(self.directory,[['a','b'],['b','c'],['a','c'],['a','b','c'],['d']])
+        count,no_of_nodes = mine(path,20)
+        for diffsets in (False,True):
+            eclat_count,patterns = eclat_patterns(path,20,diffsets)
+            self.assertEqual(eclat_count,count)
+            self.assertEqual(patterns,fp_patterns(path,20))
+            self.assertEqual(patterns[frozenset(['a','b','c'])],1)
+
+
+
+if(__name__ == "__main__"):
+    unittest.main()
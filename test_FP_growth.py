@@ -0,0 +1,229 @@
+'''
+Tests of FP_growth. Run with python -m pytest or python -m unittest.
+'''
+import contextlib
+import gzip
+import io
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import FP_growth
+
+
+def write_dataset(directory,transactions,name='data.txt'):
+    '''
+    Writes transactions (lists of items) one per line, items separated by space. Output: Path of the file.
+    '''
+    path = os.path.join(directory,name)
+    with open(path,'w') as file:
+        for transaction in transactions:
+            file.write(' '.join(transaction) + '\n')
+    return path
+
+
+def mine(path,minSup,**kwargs):
+    '''
+    Builds the FP Tree of path and mines it. Output: (count, no_of_nodes) of FP_growth.
+    '''
+    with contextlib.redirect_stdout(io.StringIO()):
+        fp_tree,minsup,sorted_frequent_items,total_trans = FP_growth.build_fp_tree(path,minSup,**kwargs)
+        return FP_growth.FP_growth(fp_tree,[],0,None,minsup)
+
+
+def frequent_itemsets(transactions,minsup):
+    '''
+    All the frequent itemsets (frozenset -> support) of transactions, by counting every subset.
+    '''
+    supports = {}
+    for transaction in transactions:
+        items = sorted(set(transaction))
+        for i in range(1,len(items) + 1):
+            for subset in itertools.combinations(items,i):
+                supports[frozenset(subset)] = supports.get(frozenset(subset),0) + 1
+    return {itemset:support for itemset,support in supports.items() if support >= minsup}
+
+
+def read_text_patterns(path):
+    '''
+    Reads the patterns written by FP_growth.text_sink. Output: frozenset -> support.
+    '''
+    patterns = {}
+    with open(path) as file:
+        for line in file:
+            items,support = line.split('#SUP:')
+            patterns[frozenset(items.split())] = int(support)
+    return patterns
+
+
+def random_transactions(seed,no_of_items=8,no_of_transactions=40):
+    r = random.Random(seed)
+    return [r.sample('abcdefghijkl'[:no_of_items],r.randint(1,no_of_items - 2)) for i in range(no_of_transactions)]
+
+
+class single_path_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_duplicate_items_are_not_filtered(self):
+        # 'a a' gives a support of 2 but its node a counter of 1, the single path keeps it like the baseline.
+        path = write_dataset(self.directory,[['a','a'],['b']])
+        self.assertEqual(mine(path,100),(2,2))
+
+    def test_count_patterns_matches_generate_patterns(self):
+        path = write_dataset(self.directory,[['a','b','c'],['a','b'],['a']])
+        with contextlib.redirect_stdout(io.StringIO()):
+            fp_tree,minsup,sorted_frequent_items,total_trans = FP_growth.build_fp_tree(path,10)
+        patterns = list(FP_growth.generate_patterns(fp_tree.root,[],0,minsup))
+        self.assertEqual(FP_growth.count_patterns(fp_tree.root,[],0),len(patterns))
+        self.assertEqual(dict(patterns)[('a','b')],2)
+
+
+def run_main(main,*args,**kwargs):
+    '''
+    Runs a main function. Output: Dictionary of the 'No of ...' lines it prints, e.g. 'Frequent Patterns' -> count.
+    '''
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        main(*args,**kwargs)
+    counts = {}
+    for line in buffer.getvalue().splitlines():
+        if line.startswith('No of '):
+            name,value = line[len('No of '):].split(':')
+            counts[name] = int(value)
+    return counts
+
+
+class snapshot_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        path = write_dataset(self.directory,[['a','b','c'],['b','c'],['a','c','d'],['c','d'],['a','b']])
+        with contextlib.redirect_stdout(io.StringIO()):
+            fp_tree,minsup,sorted_frequent_items,total_trans = FP_growth.build_fp_tree(path,20)
+        snapshot = os.path.join(self.directory,'tree.snap')
+        FP_growth.save_snapshot(fp_tree,snapshot,{'minsup':minsup})
+        tree,meta = FP_growth.load_snapshot(snapshot)
+        self.assertEqual(meta,{'minsup':minsup})
+        self.assertEqual(FP_growth.FP_growth(tree,[],0,None,minsup),FP_growth.FP_growth(fp_tree,[],0,None,minsup))
+
+    def test_main_reuses_and_rebuilds(self):
+        path = write_dataset(self.directory,[['a','b'],['a','c'],['b','c'],['a','b','c']])
+        snapshot = os.path.join(self.directory,'tree.snap')
+        built = run_main(FP_growth.main,path,50,snapshot=snapshot)
+        loaded = run_main(FP_growth.main,path,50,snapshot=snapshot)
+        self.assertIn('Items',built)
+        self.assertNotIn('Items',loaded)       # Only printed when the data set is read.
+        self.assertEqual(loaded['Frequent Patterns'],built['Frequent Patterns'])
+        write_dataset(self.directory,[['a','b'],['a','b'],['a','b'],['c']])
+        stat = os.stat(path)
+        os.utime(path,ns=(stat.st_atime_ns,stat.st_mtime_ns + 10**9))
+        changed = run_main(FP_growth.main,path,50,snapshot=snapshot)
+        self.assertIn('Items',changed)
+        self.assertEqual(changed['Frequent Patterns'],4)
+
+
+
+class closed_maximal_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_against_counting(self):
+        output_path = os.path.join(self.directory,'patterns.txt')
+        for seed in range(15):
+            transactions = random_transactions(seed)
+            path = write_dataset(self.directory,transactions)
+            for minSup in (10,25):
+                frequent = frequent_itemsets(transactions,minSup*len(transactions)/100)
+                closed = {itemset:support for itemset,support in frequent.items()
+                          if not any(itemset < other and support == frequent[other] for other in frequent)}
+                maximal = {itemset:support for itemset,support in frequent.items()
+                           if not any(itemset < other for other in frequent)}
+                for mode,expected in (('closed',closed),('maximal',maximal)):
+                    counts = run_main(FP_growth.main,path,minSup,mode=mode,output_format='text',
+                                      output_path=output_path)
+                    self.assertEqual(read_text_patterns(output_path),expected,(seed,minSup,mode))
+                    self.assertEqual(counts['Frequent Patterns'],len(expected))
+
+    def test_modes_need_single_process_FP_tree(self):
+        path = write_dataset(self.directory,[['a','b']])
+        for kwargs in ({'array_tree':True},{'workers':2}):
+            with self.assertRaises(ValueError):
+                FP_growth.main(path,50,mode='closed',**kwargs)
+
+
+class top_k_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_against_counting(self):
+        for seed in range(15):
+            transactions = random_transactions(seed)
+            path = write_dataset(self.directory,transactions)
+            supports = frequent_itemsets(transactions,1)
+            for k,min_length in ((1,1),(5,1),(12,2),(10,3),(1000,1)):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    patterns = FP_growth.top_k_main(path,k,min_length)
+                expected = sorted((support for itemset,support in supports.items() if len(itemset) >= min_length),
+                                  reverse=True)[:k]
+                self.assertEqual([support for pattern,support in patterns],expected,(seed,k,min_length))
+                self.assertEqual(len(set(frozenset(pattern) for pattern,support in patterns)),len(patterns))
+                for pattern,support in patterns:
+                    self.assertGreaterEqual(len(pattern),min_length)
+                    self.assertEqual(supports[frozenset(pattern)],support)
+
+
+class read_transactions_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self,name,text):
+        path = os.path.join(self.directory,name)
+        with (gzip.open if name.endswith('.gz') else open)(path,'wt') as file:
+            file.write(text)
+        return path
+
+    def test_text(self):
+        for name in ('data.txt','data.txt.gz'):
+            path = self.write(name,'a  b\n\nc\td \nb')
+            self.assertEqual(list(FP_growth.read_transactions(path)),[['a','b'],[],['c','d'],['b']])
+            item_ids = {}
+            self.assertEqual(list(FP_growth.read_transactions(path,'text',item_ids)),[[0,1],[],[2,3],[1]])
+            self.assertEqual(item_ids,{'a':0,'b':1,'c':2,'d':3})
+
+    def test_integers_with_and_without_numpy(self):
+        path = self.write('data.spmf','@CONVERTED\n# comment\n1 2\t3\r\n\n 7\x0c\n10  4')
+        bad_path = self.write('bad.txt','1 2\n3 x\n')
+        np = FP_growth.np
+        try:
+            for numpy in (np,None):
+                FP_growth.np = numpy
+                self.assertEqual(list(FP_growth.read_transactions(path,'spmf',{})),[[1,2,3],[],[7],[10,4]])
+                with self.assertRaises(ValueError):
+                    list(FP_growth.read_transactions(bad_path,'fimi',{}))
+        finally:
+            FP_growth.np = np
+
+
+
+if(__name__ == "__main__"):
+    unittest.main()
@@ -0,0 +1,91 @@
+'''
+Tests of Incremental_FP_growth. Run with python -m pytest or python -m unittest.
+'''
+import itertools
+import random
+import unittest
+
+from Incremental_FP_growth import incremental_FP_tree
+
+
+class pattern_sink:
+    '''
+    Keeps every pattern as frozenset -> support.
+    '''
+    needs_patterns = True
+    def __init__(self):
+        self.patterns = {}
+    def emit(self,pattern,support):
+        self.patterns[frozenset(pattern)] = support
+
+
+def frequent_itemsets(transactions,minsup):
+    '''
+    All the frequent itemsets of (itemset, weight) transactions by counting every subset.
+    '''
+    supports = {}
+    for itemset,weight in transactions:
+        items = sorted(set(itemset))
+        for i in range(1,len(items) + 1):
+            for subset in itertools.combinations(items,i):
+                supports[frozenset(subset)] = supports.get(frozenset(subset),0) + weight
+    return {itemset:support for itemset,support in supports.items() if support >= minsup}
+
+
+class expire_test(unittest.TestCase):
+    def test_expire_prefix_never_added(self):
+        tree = incremental_FP_tree()
+        tree.add([(['a','b'],1),(['c'],1)])
+        with self.assertRaises(ValueError):
+            tree.expire([(['a'],1)])
+        self.assertEqual(tree.total_trans,2)
+        self.assertEqual(tree.items_support,{'a':1,'b':1,'c':1})
+        tree.add([(['c'],2)])
+        sink = pattern_sink()
+        tree.mine(1,sink)
+        self.assertEqual(sink.patterns,frequent_itemsets([(['a','b'],1),(['c'],3)],1))
+
+    def test_expire_unknown_items(self):
+        tree = incremental_FP_tree()
+        tree.add([(['a','b'],1)])
+        for itemset in (['x','y'],['a','z']):
+            with self.assertRaises(ValueError):
+                tree.expire([(itemset,1)])
+
+    def test_expire_batch_is_atomic(self):
+        tree = incremental_FP_tree()
+        tree.add([(['a','b'],1),(['c'],1)])
+        nodes = tree.fp_tree.nodeCount
+        with self.assertRaises(ValueError):
+            tree.expire([(['c'],1),(['a','b'],1),(['b','a'],1)])     # a b was added only once.
+        self.assertEqual(tree.total_trans,2)
+        self.assertEqual(tree.items_support,{'a':1,'b':1,'c':1})
+        self.assertEqual(tree.fp_tree.nodeCount,nodes)
+        tree.expire([(['c'],1),(['b','a'],1)])
+        self.assertEqual(tree.total_trans,0)
+        self.assertEqual(tree.fp_tree.nodeCount,1)
+
+
+class restructure_test(unittest.TestCase):
+    def test_add_expire_matches_counting(self):
+        for seed in range(30):
+            r = random.Random(seed)
+            window = []
+            tree = incremental_FP_tree()
+            for step in range(6):
+                batch = [([r.choice('abcdefg') for j in range(r.randint(1,5))],r.randint(1,3))
+                         for i in range(r.randint(1,8))]
+                tree.add(batch,restructure=r.random() < 0.7)
+                window.extend(batch)
+                expired = window[:r.randint(0,len(window) // 2)]
+                window = window[len(expired):]
+                tree.expire(expired,restructure=r.random() < 0.7)
+                minsup = r.randint(1,4)
+                sink = pattern_sink()
+                tree.mine(minsup,sink)
+                self.assertEqual(sink.patterns,frequent_itemsets(window,minsup),(seed,step))
+
+
+
+if(__name__ == "__main__"):
+    unittest.main()
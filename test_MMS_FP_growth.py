@@ -0,0 +1,61 @@
+'''
+Tests of MMS_FP_growth. Run with python -m pytest or python -m unittest.
+'''
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import MMS_FP_growth
+from test_FP_growth import write_dataset, run_main
+
+
+class snapshot_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_main_reuses_and_rebuilds(self):
+        path = write_dataset(self.directory,[['a','b','c'],['a','b'],['a','c'],['b','d'],['a','b','d']])
+        snapshot = os.path.join(self.directory,'tree.snap')
+        built = run_main(MMS_FP_growth.main,path,0.5,20,snapshot=snapshot)
+        loaded = run_main(MMS_FP_growth.main,path,0.5,20,snapshot=snapshot)
+        self.assertEqual(loaded,built)
+        write_dataset(self.directory,[['a','b'],['a','b'],['a','b'],['a','b'],['c']])
+        stat = os.stat(path)
+        os.utime(path,ns=(stat.st_atime_ns,stat.st_mtime_ns + 10**9))
+        changed = run_main(MMS_FP_growth.main,path,0.5,20,snapshot=snapshot)
+        self.assertEqual(changed,run_main(MMS_FP_growth.main,path,0.5,20))
+        self.assertNotEqual(changed,built)
+
+
+
+class sweep_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_failed_config_does_not_stop_sweep(self):
+        # minSup 90 raises UnboundLocalError in pruneCompactMISTree on this data set, 30 works.
+        path = write_dataset(self.directory,[['a','c','d','b'],['d','c','b'],['c','b'],['e'],['e','f','b'],
+                                             ['a','f','c'],['e','a','c','b']])
+        for workers in (1,2):
+            output = io.StringIO()
+            rows = MMS_FP_growth.sweep(path,[0,1],[30,90],workers,file=output)
+            self.assertEqual([row[:2] for row in rows],[(0,30),(0,90),(1,30),(1,90)])
+            self.assertIsInstance(rows[1][2],Exception)
+            self.assertIsInstance(rows[3][2],Exception)
+            self.assertIn('error: UnboundLocalError',output.getvalue())
+            for row in (rows[0],rows[2]):
+                counts = run_main(MMS_FP_growth.main,path,row[0],row[1])
+                self.assertEqual(row[2:5],(counts['Frequent Items'],counts['Frequent Patterns'],counts['Nodes']))
+
+
+
+if(__name__ == "__main__"):
+    unittest.main()
@@ -0,0 +1,97 @@
+'''
+Tests of Mining_session. Run with python -m pytest or python -m unittest.
+'''
+import contextlib
+import io
+import random
+import shutil
+import tempfile
+import unittest
+
+import FP_growth
+from Mining_session import mining_session
+from test_FP_growth import write_dataset
+
+
+class pattern_sink(FP_growth.count_sink):
+    '''
+    Keeps every pattern as frozenset -> support.
+    '''
+    needs_patterns = True
+    def __init__(self):
+        FP_growth.count_sink.__init__(self)
+        self.patterns = {}
+    def emit(self,pattern,support):
+        self.count += 1
+        self.patterns[frozenset(pattern)] = support
+
+
+def fp_patterns(path,minSup):
+    with contextlib.redirect_stdout(io.StringIO()):
+        fp_tree,minsup,sorted_frequent_items,total_trans = FP_growth.build_fp_tree(path,minSup)
+    sink = pattern_sink()
+    FP_growth.FP_growth(fp_tree,[],0,sink,minsup)
+    return sink.patterns
+
+
+class mining_session_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        r = random.Random(5)
+        transactions = [r.sample('abcdefgh',r.randint(1,6)) for i in range(60)]
+        self.path = write_dataset(self.directory,transactions)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def session(self,**kwargs):
+        return mining_session(self.path,self.directory + '/cache',**kwargs)
+
+    def test_queries_match_FP_growth(self):
+        session = self.session()
+        with contextlib.redirect_stdout(io.StringIO()):
+            session.prepare([5])
+            for minSup in (5,10,20,40):
+                expected = fp_patterns(self.path,minSup)
+                patterns = list(session.patterns(minSup))
+                self.assertEqual(dict((frozenset(pattern),support) for pattern,support in patterns),expected)
+                self.assertEqual(len(patterns),len(expected))
+                self.assertEqual(session.query(minSup),len(expected))
+                supports = [support for pattern,support in patterns]
+                self.assertEqual(supports,sorted(supports,reverse=True))
+
+    def test_levels(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            entry = self.session().prepare([5])
+        supports = [support for support,end,count in entry['levels']]
+        self.assertEqual(supports,sorted(set(supports),reverse=True))
+        ends = [end for support,end,count in entry['levels']]
+        counts = [count for support,end,count in entry['levels']]
+        self.assertEqual(ends,sorted(ends))
+        self.assertEqual(counts,sorted(counts))
+        self.assertEqual(ends[-1],entry['bytes'])
+        self.assertEqual(counts[-1],len(fp_patterns(self.path,5)))
+
+    def test_external_sort_same_store(self):
+        stores = []
+        for run_bytes in (64<<20,100,1):      # One run, a few runs and enough runs for several merge passes.
+            shutil.rmtree(self.directory + '/cache',ignore_errors=True)
+            session = self.session(run_bytes=run_bytes)
+            with contextlib.redirect_stdout(io.StringIO()):
+                entry = session.prepare([5])
+            with open(session.store_path(session.key),'rb') as file:
+                stores.append((entry['levels'],entry['item_names'],file.read()))
+        self.assertEqual(stores[1],stores[0])
+        self.assertEqual(stores[2],stores[0])
+
+    def test_query_below_floor_mines_again(self):
+        session = self.session()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(session.prepare([20])['floor'],20)
+            self.assertEqual(session.query(5),len(fp_patterns(self.path,5)))
+            self.assertEqual(session.prepare([10])['floor'],5)
+
+
+
+if(__name__ == "__main__"):
+    unittest.main()